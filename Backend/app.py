@@ -1,8 +1,21 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, abort, make_response
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from models import db, User, Project, Category, Skill, Experience, Article, Comment, Contact
-from werkzeug.utils import secure_filename
+from sqlalchemy.orm import joinedload, selectinload
+from models import db, User, Project, Category, Skill, Experience, Article, Comment, Contact, SiteStats
+from counters import view_counter, increment, RotatingBloomFilter
+import site_stats
+import search as project_search
+import reads
+import media
+import tags as tag_index
+from pagination import keyset_paginate, InvalidCursor
+from cache import response_cache
+from fragments import row_fragments, list_response
+import encoding
+from versions import table_versions
+from compression import compressor
+from assets import assets
 from slugify import slugify
 import os
 import time
@@ -19,6 +32,9 @@ app = Flask(__name__)
 allowed_origins = os.environ.get('ALLOWED_ORIGINS', 'http://localhost,http://localhost:80,http://localhost:5000,http://127.0.0.1:5000').split(',')
 CORS(app, origins=allowed_origins, supports_credentials=True)
 
+# jsonify through orjson when it is installed (stdlib encoder otherwise)
+encoding.init_app(app)
+
 # Konfigurasi
 database_url = os.environ.get('DATABASE_URL')
 # Fix for Railway/Render/Vercel (postgres:// to postgresql://)
@@ -34,7 +50,22 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'change-this-in-production-please')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', '/app/uploads')
+app.config['UPLOAD_DELIVERY'] = os.environ.get('UPLOAD_DELIVERY', 'python')  # python | x-accel (nginx) | x-sendfile
+app.config['UPLOAD_ACCEL_PREFIX'] = os.environ.get('UPLOAD_ACCEL_PREFIX', '/_uploads/')  # internal nginx location
+app.config['UPLOAD_MAX_AGE'] = int(os.environ.get('UPLOAD_MAX_AGE', 2592000))  # seconds browsers may cache an upload
+app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 1))  # variant processes per worker, 0 renders inline
 app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB max
+app.config['REDIS_URL'] = os.environ.get('REDIS_URL')
+app.config['VIEW_FLUSH_INTERVAL'] = float(os.environ.get('VIEW_FLUSH_INTERVAL', 5))  # seconds
+app.config['VIEW_FLUSH_THRESHOLD'] = int(os.environ.get('VIEW_FLUSH_THRESHOLD', 500))  # pending rows
+app.config['LIKE_DEDUPE_WINDOW'] = int(os.environ.get('LIKE_DEDUPE_WINDOW', 24 * 60 * 60))  # seconds
+app.config['LIKE_DEDUPE_CAPACITY'] = int(os.environ.get('LIKE_DEDUPE_CAPACITY', 100000))  # likes per window
+app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))  # seconds, 0 disables
+app.config['RESPONSE_CACHE_SIZE'] = int(os.environ.get('RESPONSE_CACHE_SIZE', 512))  # entries per worker
+app.config['ROW_FRAGMENT_CACHE_SIZE'] = int(os.environ.get('ROW_FRAGMENT_CACHE_SIZE', 20000))  # serialized rows per worker, 0 disables
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # bytes, 0 disables compression
+app.config['ASSET_RELOAD'] = os.environ.get('ASSET_RELOAD', '').lower() in ('1', 'true', 'yes')  # rebuild the asset manifest when Frontend/ changes
+app.config['TABLE_VERSION_REFRESH'] = float(os.environ.get('TABLE_VERSION_REFRESH', 1))  # seconds
 
 # Pastikan folder upload ada
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -42,11 +73,61 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 db.init_app(app)
 jwt = JWTManager(app)
 
+# Views are buffered and flushed in batches instead of committed per GET
+view_counter.init_app(app)
+view_counter.register(Project)
+view_counter.register(Article)
+view_counter.register(SiteStats)
+
+# Repeat likes from the same client are dropped before touching the database
+like_filter = RotatingBloomFilter(
+    capacity=app.config['LIKE_DEDUPE_CAPACITY'],
+    window=app.config['LIKE_DEDUPE_WINDOW']
+)
+
+# Every commit bumps the version of the tables it wrote; ETags and the
+# response cache are keyed on those versions. View count flushes do not:
+# views alone would otherwise invalidate every list and detail ETag
+table_versions.init_app(app)
+
+# Public list endpoints are cached until one of their tables changes
+response_cache.init_app(app, versions=table_versions)
+
+# Serialized rows are reused across list responses until the row changes
+row_fragments.init_app(app, versions=table_versions)
+
+# gzip/brotli for larger API responses; Frontend assets are precompressed
+# at build time (precompress.py)
+compressor.init_app(app)
+
+# Content-hashed Frontend assets with immutable caching
+assets.init_app(app, '../Frontend')
+
+# WebP/AVIF variants of uploaded images, built in a process pool
+media.image_pipeline.init_app(app)
+
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def client_fingerprint():
+    # First hop of X-Forwarded-For when behind nginx/Render, plus the user agent
+    forwarded = request.headers.get('X-Forwarded-For', '')
+    ip = forwarded.split(',')[0].strip() or request.remote_addr or ''
+    return f"{ip}|{request.headers.get('User-Agent', '')}"
+
+def requested_includes(includes):
+    """Known names from ``?include=a,b``, in request order"""
+    names = (name.strip() for name in request.args.get('include', '').split(','))
+    return [name for name in dict.fromkeys(names) if name in includes]
+
+def include_related(data, obj, includes, names):
+    """Adds ``included: {name: ...}`` for each requested related resource"""
+    if names:
+        data['included'] = {name: includes[name][1](obj) for name in names}
+    return data
+
 # Inisialisasi database dengan retry logic
 def init_db():
     max_retries = 5
@@ -139,59 +220,144 @@ def get_current_user():
 
 # ============= PROJECT ROUTES =============
 
+# sort key -> (column, descending); ties are broken by id
+PROJECT_SORTS = {
+    'created_at': (Project.created_at, True),
+    'views': (Project.views, True),
+    'likes': (Project.likes, True),
+    'title': (Project.title, False)
+}
+
 @app.route('/api/projects', methods=['GET'])
+@table_versions.conditional('projects', 'categories', 'comments', 'uploads')
+@response_cache.cached('projects', 'categories', 'comments', 'uploads')
 def get_projects():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     category_id = request.args.get('category', type=int)
     search = request.args.get('search', '')
-    sort_by = request.args.get('sort', 'created_at')
+    sort_by = request.args.get('sort', 'relevance' if search else 'created_at')
     featured = request.args.get('featured', type=bool)
+    tag = request.args.get('tag', '')
+    cursor_mode = 'cursor' in request.args
+    fields = Project.parse_fields(request.args.get('fields'), Project.card_fields)
+    
+    sort_column, descending = PROJECT_SORTS.get(sort_by, PROJECT_SORTS['created_at'])
     
-    query = Project.query
+    # Core select of only the columns behind ``fields``, rows mapped to
+    # slotted DTOs; category is joined in and comments_count comes with the
+    # row when requested (see reads.py and models.py)
+    query, make_row = reads.statement(Project, fields, sort_column, Project.updated_at)
     
     if category_id:
-        query = query.filter_by(category_id=category_id)
+        query = query.where(Project.category_id == category_id)
     
+    # Full-text match; sort=relevance orders by rank (offset mode only)
+    ranked = bool(search) and sort_by == 'relevance' and not cursor_mode
     if search:
-        query = query.filter(
-            (Project.title.ilike(f'%{search}%')) | 
-            (Project.description.ilike(f'%{search}%'))
-        )
+        query = project_search.apply(query, search, ranked=ranked)
     
     if featured:
-        query = query.filter_by(featured=True)
+        query = query.where(Project.featured.is_(True))
     
-    # Sorting
-    if sort_by == 'views':
-        query = query.order_by(Project.views.desc())
-    elif sort_by == 'likes':
-        query = query.order_by(Project.likes.desc())
-    elif sort_by == 'title':
-        query = query.order_by(Project.title)
-    else:
-        query = query.order_by(Project.created_at.desc())
+    if tag:
+        query = query.where(tag_index.has_tag(Project, tag))
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    if sort_by not in PROJECT_SORTS:
+        sort_by = 'created_at'
     
-    return jsonify({
-        'projects': [p.to_json() for p in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page,
-        'has_next': pagination.has_next,
-        'has_prev': pagination.has_prev
-    })
+    # Cursor mode (?cursor=, empty for the first page): no OFFSET, no COUNT(*)
+    if cursor_mode:
+        try:
+            items, next_cursor = keyset_paginate(
+                query, Project, sort_by, sort_column, descending,
+                request.args['cursor'], per_page,
+                fetch=lambda stmt: reads.fetch(stmt, make_row)
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        return list_response(
+            'projects', row_fragments.render(Project, items, fields),
+            next_cursor=next_cursor,
+            has_next=next_cursor is not None
+        )
+    
+    # Sorting (ranked searches are already ordered by relevance)
+    if not ranked:
+        if descending:
+            query = query.order_by(sort_column.desc(), Project.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Project.id.asc())
+    
+    pagination = reads.paginate(query, make_row, page, per_page)
+    
+    return list_response(
+        'projects', row_fragments.render(Project, pagination.items, fields),
+        total=pagination.total,
+        pages=pagination.pages,
+        current_page=page,
+        has_next=pagination.has_next,
+        has_prev=pagination.has_prev
+    )
+
+def count_project_view(id):
+    view_counter.incr(Project, id)
+    view_counter.incr(SiteStats, site_stats.SITE_STATS_ID, 'total_views')
+
+def newest_first(rows):
+    return sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)
+
+# ?include= on the project detail: name -> (loader option, serializer). The
+# comments and tags come from one batched selectinload each; the category
+# list is what the admin edit form needs next to the project.
+PROJECT_INCLUDES = {
+    'comments': (
+        selectinload(Project.comments.and_(Comment.approved.is_(True))),
+        lambda p: [c.to_json() for c in newest_first(p.comments)]
+    ),
+    'category': (
+        joinedload(Project.category),
+        lambda p: p.category.to_json() if p.category else None
+    ),
+    'tags': (
+        selectinload(Project.tag_set),
+        lambda p: [t.to_json() for t in p.tag_set]
+    ),
+    'categories': (
+        None,
+        lambda p: [c.to_json() for c in Category.query.all()]
+    )
+}
 
 @app.route('/api/projects/<int:id>', methods=['GET'])
 def get_project(id):
-    project = Project.query.get_or_404(id)
+    # Revalidation is answered from the table versions alone, no query
+    etag = table_versions.etag('projects', 'categories', 'comments', 'uploads')
+    if request.if_none_match.contains_weak(etag):
+        # The ETag covers the table, not the id: check the row exists (one
+        # primary key probe) so replayed ETags cannot count made-up views
+        if db.session.query(Project.id).filter_by(id=id).scalar() is None:
+            abort(404)
+        count_project_view(id)
+        return table_versions.not_modified(etag)
+    
+    fields = Project.parse_fields(request.args.get('fields'))
+    includes = requested_includes(PROJECT_INCLUDES)
+    options = [PROJECT_INCLUDES[name][0] for name in includes if PROJECT_INCLUDES[name][0]]
+    project = db.first_or_404(
+        db.select(Project).options(*Project.load_options(fields), *options).filter_by(id=id)
+    )
     
-    # Increment views
-    project.views += 1
-    db.session.commit()
+    # Increment views (buffered, written by the view counter flush)
+    count_project_view(id)
+    data = project.to_json(fields)
+    if 'views' in data:
+        data['views'] = (data['views'] or 0) + view_counter.pending(Project, id)
+    include_related(data, project, PROJECT_INCLUDES, includes)
     
-    return jsonify(project.to_json())
+    response = jsonify(data)
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/projects', methods=['POST'])
 def add_project():
@@ -205,11 +371,13 @@ def add_project():
         demo_url=data.get('demo_url'),
         github_url=data.get('github_url'),
         category_id=data.get('category_id'),
-        tags=data.get('tags', ''),
         featured=data.get('featured', False)
     )
+    tag_index.set_tags(new_project, data.get('tags', ''))
     
     db.session.add(new_project)
+    media.attach(new_project.image_url)
+    site_stats.bump(total_projects=1)
     db.session.commit()
     
     return jsonify({"message": "Project created", "project": new_project.to_json()}), 201
@@ -218,6 +386,7 @@ def add_project():
 def update_project(id):
     project = Project.query.get_or_404(id)
     data = request.json
+    old_image = project.image_url
     
     project.title = data.get('title', project.title)
     project.description = data.get('description', project.description)
@@ -226,35 +395,65 @@ def update_project(id):
     project.demo_url = data.get('demo_url', project.demo_url)
     project.github_url = data.get('github_url', project.github_url)
     project.category_id = data.get('category_id', project.category_id)
-    project.tags = data.get('tags', project.tags)
+    if 'tags' in data:
+        tag_index.set_tags(project, data['tags'])
     project.featured = data.get('featured', project.featured)
     
+    if project.image_url != old_image:
+        media.attach(project.image_url)
     db.session.commit()
+    if project.image_url != old_image:
+        media.release(old_image)
     
     return jsonify({"message": "Project updated", "project": project.to_json()})
 
 @app.route('/api/projects/<int:id>', methods=['DELETE'])
 def delete_project(id):
     project = Project.query.get_or_404(id)
+    site_stats.bump(
+        total_projects=-1,
+        total_views=-((project.views or 0) + view_counter.pending(Project, id)),
+        total_likes=-(project.likes or 0),
+        total_comments=-Comment.query.filter_by(project_id=id, approved=True).count()
+    )
+    image_url = project.image_url
     db.session.delete(project)
     db.session.commit()
+    media.release(image_url)
     
     return jsonify({"message": "Project deleted"})
 
 @app.route('/api/projects/<int:id>/like', methods=['POST'])
 def like_project(id):
-    project = Project.query.get_or_404(id)
-    project.likes += 1
+    if not like_filter.add(f"{id}|{client_fingerprint()}"):
+        # Repeat click: report the current count without writing
+        row = db.session.query(Project.likes).filter_by(id=id).first()
+        if row is None:
+            abort(404)
+        return jsonify({"likes": row.likes or 0})
+    
+    # Single UPDATE ... SET likes = likes + 1 RETURNING likes, no lost updates
+    likes = increment(Project, id, 'likes')
+    if likes is None:
+        db.session.rollback()
+        abort(404)
+    # Same transaction as the UPDATE, so reconcile() sees both or neither
+    site_stats.bump(total_likes=1)
     db.session.commit()
+    table_versions.bump('projects')
     
-    return jsonify({"likes": project.likes})
+    return jsonify({"likes": likes})
 
 # ============= CATEGORY ROUTES =============
 
 @app.route('/api/categories', methods=['GET'])
+@table_versions.conditional('categories')
+@response_cache.cached('categories')
 def get_categories():
-    categories = Category.query.all()
-    return jsonify([c.to_json() for c in categories])
+    fields = Category.parse_fields(request.args.get('fields'))
+    query, make_row = reads.statement(Category, fields)
+    categories = reads.fetch(query, make_row)
+    return jsonify([c.to_json(fields) for c in categories])
 
 @app.route('/api/categories', methods=['POST'])
 def add_category():
@@ -264,18 +463,29 @@ def add_category():
     db.session.commit()
     return jsonify(category.to_json()), 201
 
+# ============= TAG ROUTES =============
+
+@app.route('/api/tags', methods=['GET'])
+@table_versions.conditional('tags', 'projects', 'articles')
+@response_cache.cached('tags', 'projects', 'articles')
+def get_tags():
+    return jsonify(tag_index.usage_counts())
+
 # ============= SKILL ROUTES =============
 
 @app.route('/api/skills', methods=['GET'])
+@table_versions.conditional('skills')
+@response_cache.cached('skills')
 def get_skills():
     category = request.args.get('category')
-    query = Skill.query
+    fields = Skill.parse_fields(request.args.get('fields'))
+    query, make_row = reads.statement(Skill, fields)
     
     if category:
-        query = query.filter_by(category=category)
+        query = query.where(Skill.category == category)
     
-    skills = query.all()
-    return jsonify([s.to_json() for s in skills])
+    skills = reads.fetch(query, make_row)
+    return jsonify([s.to_json(fields) for s in skills])
 
 @app.route('/api/skills', methods=['POST'])
 def add_skill():
@@ -287,6 +497,7 @@ def add_skill():
         category=data.get('category')
     )
     db.session.add(skill)
+    site_stats.bump(total_skills=1)
     db.session.commit()
     return jsonify(skill.to_json()), 201
 
@@ -307,15 +518,20 @@ def update_skill(id):
 def delete_skill(id):
     skill = Skill.query.get_or_404(id)
     db.session.delete(skill)
+    site_stats.bump(total_skills=-1)
     db.session.commit()
     return jsonify({"message": "Skill deleted"})
 
 # ============= EXPERIENCE ROUTES =============
 
 @app.route('/api/experiences', methods=['GET'])
+@table_versions.conditional('experiences')
+@response_cache.cached('experiences')
 def get_experiences():
-    experiences = Experience.query.order_by(Experience.start_date.desc()).all()
-    return jsonify([e.to_json() for e in experiences])
+    fields = Experience.parse_fields(request.args.get('fields'))
+    query, make_row = reads.statement(Experience, fields)
+    experiences = reads.fetch(query.order_by(Experience.start_date.desc()), make_row)
+    return jsonify([e.to_json(fields) for e in experiences])
 
 @app.route('/api/experiences', methods=['POST'])
 def add_experience():
@@ -359,31 +575,94 @@ def delete_experience(id):
 # ============= ARTICLE/BLOG ROUTES =============
 
 @app.route('/api/articles', methods=['GET'])
+@table_versions.conditional('articles', 'uploads')
+@response_cache.cached('articles', 'uploads')
 def get_articles():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 6, type=int)
     published_only = request.args.get('published', True, type=bool)
+    tag = request.args.get('tag', '')
+    fields = Article.parse_fields(request.args.get('fields'), Article.card_fields)
     
-    query = Article.query
+    # Cards skip the content body; ``preview`` is cut from it in SQL
+    query, make_row = reads.statement(Article, fields, Article.created_at, Article.updated_at)
     if published_only:
-        query = query.filter_by(published=True)
+        query = query.where(Article.published.is_(True))
+    if tag:
+        query = query.where(tag_index.has_tag(Article, tag))
+    
+    if 'cursor' in request.args:
+        try:
+            items, next_cursor = keyset_paginate(
+                query, Article, 'created_at', Article.created_at, True,
+                request.args['cursor'], per_page,
+                fetch=lambda stmt: reads.fetch(stmt, make_row)
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        return list_response(
+            'articles', row_fragments.render(Article, items, fields),
+            next_cursor=next_cursor,
+            has_next=next_cursor is not None
+        )
     
-    query = query.order_by(Article.created_at.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    query = query.order_by(Article.created_at.desc(), Article.id.desc())
+    pagination = reads.paginate(query, make_row, page, per_page)
     
-    return jsonify({
-        'articles': [a.to_json() for a in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
-    })
+    return list_response(
+        'articles', row_fragments.render(Article, pagination.items, fields),
+        total=pagination.total,
+        pages=pagination.pages,
+        current_page=page
+    )
+
+# slug -> (ETag, id), so a 304 on an article can still count the view without
+# a query. An entry is only used under the ETag it was read at: a rename or
+# delete in another worker bumps the articles version, not this dict
+article_ids = {}
+
+def article_id(slug, etag):
+    """Id of the article at ``slug``, or None"""
+    cached = article_ids.get(slug)
+    if cached is not None and cached[0] == etag:
+        return cached[1]
+    found = db.session.query(Article.id).filter_by(slug=slug).scalar()
+    if found is not None:
+        article_ids[slug] = (etag, found)
+    return found
+
+ARTICLE_INCLUDES = {
+    'tags': (
+        selectinload(Article.tag_set),
+        lambda a: [t.to_json() for t in a.tag_set]
+    )
+}
 
 @app.route('/api/articles/<slug>', methods=['GET'])
 def get_article(slug):
-    article = Article.query.filter_by(slug=slug).first_or_404()
-    article.views += 1
-    db.session.commit()
-    return jsonify(article.to_json())
+    etag = table_versions.etag('articles', 'uploads')
+    if request.if_none_match.contains_weak(etag):
+        # As in get_project: the ETag covers the table, not the slug
+        found = article_id(slug, etag)
+        if found is None:
+            abort(404)
+        view_counter.incr(Article, found)
+        return table_versions.not_modified(etag)
+    
+    fields = Article.parse_fields(request.args.get('fields'))
+    includes = requested_includes(ARTICLE_INCLUDES)
+    options = [ARTICLE_INCLUDES[name][0] for name in includes]
+    article = (Article.query.options(*Article.load_options(fields), *options)
+               .filter_by(slug=slug).first_or_404())
+    article_ids[slug] = (etag, article.id)
+    view_counter.incr(Article, article.id)
+    data = article.to_json(fields)
+    if 'views' in data:
+        data['views'] = (data['views'] or 0) + view_counter.pending(Article, article.id)
+    include_related(data, article, ARTICLE_INCLUDES, includes)
+    response = jsonify(data)
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/articles', methods=['POST'])
 def create_article():
@@ -396,11 +675,14 @@ def create_article():
         content=data['content'],
         excerpt=data.get('excerpt'),
         cover_image=data.get('cover_image'),
-        tags=data.get('tags', ''),
         published=data.get('published', False)
     )
+    tag_index.set_tags(article, data.get('tags', ''))
     
     db.session.add(article)
+    media.attach(article.cover_image)
+    if article.published:
+        site_stats.bump(total_articles=1)
     db.session.commit()
     return jsonify(article.to_json()), 201
 
@@ -408,31 +690,48 @@ def create_article():
 def update_article(id):
     article = Article.query.get_or_404(id)
     data = request.json
+    was_published = bool(article.published)
+    old_cover = article.cover_image
+    article_ids.pop(article.slug, None)
     
     article.title = data.get('title', article.title)
     article.slug = slugify(data.get('title', article.title))
     article.content = data.get('content', article.content)
     article.excerpt = data.get('excerpt', article.excerpt)
     article.cover_image = data.get('cover_image', article.cover_image)
-    article.tags = data.get('tags', article.tags)
+    if 'tags' in data:
+        tag_index.set_tags(article, data['tags'])
     article.published = data.get('published', article.published)
     
+    if bool(article.published) != was_published:
+        site_stats.bump(total_articles=1 if article.published else -1)
+    if article.cover_image != old_cover:
+        media.attach(article.cover_image)
     db.session.commit()
+    if article.cover_image != old_cover:
+        media.release(old_cover)
     return jsonify({"message": "Article updated", "article": article.to_json()})
 
 @app.route('/api/articles/<int:id>', methods=['DELETE'])
 def delete_article(id):
     article = Article.query.get_or_404(id)
+    if article.published:
+        site_stats.bump(total_articles=-1)
+    cover_image = article.cover_image
+    article_ids.pop(article.slug, None)
     db.session.delete(article)
     db.session.commit()
+    media.release(cover_image)
     return jsonify({"message": "Article deleted"})
 
 # ============= COMMENT ROUTES =============
 
 @app.route('/api/projects/<int:id>/comments', methods=['GET'])
 def get_comments(id):
-    comments = Comment.query.filter_by(project_id=id, approved=True).order_by(Comment.created_at.desc()).all()
-    return jsonify([c.to_json() for c in comments])
+    fields = Comment.parse_fields(request.args.get('fields'))
+    comments = (Comment.query.options(*Comment.load_options(fields))
+                .filter_by(project_id=id, approved=True).order_by(Comment.created_at.desc()).all())
+    return jsonify([c.to_json(fields) for c in comments])
 
 @app.route('/api/projects/<int:id>/comments', methods=['POST'])
 def add_comment(id):
@@ -451,7 +750,9 @@ def add_comment(id):
 @app.route('/api/comments/<int:id>/approve', methods=['PUT'])
 def approve_comment(id):
     comment = Comment.query.get_or_404(id)
-    comment.approved = True
+    if not comment.approved:
+        comment.approved = True
+        site_stats.bump(total_comments=1)
     db.session.commit()
     return jsonify({"message": "Comment approved"})
 
@@ -467,18 +768,22 @@ def submit_contact():
         message=data['message']
     )
     db.session.add(contact)
+    site_stats.bump(unread_messages=1)
     db.session.commit()
     return jsonify({"message": "Message sent successfully"}), 201
 
 @app.route('/api/contacts', methods=['GET'])
 def get_contacts():
-    contacts = Contact.query.order_by(Contact.created_at.desc()).all()
-    return jsonify([c.to_json() for c in contacts])
+    fields = Contact.parse_fields(request.args.get('fields'))
+    contacts = Contact.query.options(*Contact.load_options(fields)).order_by(Contact.created_at.desc()).all()
+    return jsonify([c.to_json(fields) for c in contacts])
 
 @app.route('/api/contacts/<int:id>/read', methods=['PUT'])
 def mark_contact_read(id):
     contact = Contact.query.get_or_404(id)
-    contact.read = True
+    if not contact.read:
+        contact.read = True
+        site_stats.bump(unread_messages=-1)
     db.session.commit()
     return jsonify({"message": "Marked as read"})
 
@@ -495,43 +800,45 @@ def upload_file():
         return jsonify({"error": "No file selected"}), 400
     
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        timestamp = int(time.time())
-        filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # Stored once per content hash; variants are built in the background
+        upload, created = media.store_upload(file)
         
         return jsonify({
-            "message": "File uploaded",
-            "url": f"/uploads/{filename}"
-        }), 201
+            "message": "File uploaded" if created else "File already uploaded",
+            "url": upload.url,
+            "upload": upload.to_json()
+        }), 201 if created else 200
     
     return jsonify({"error": "Invalid file type"}), 400
 
-@app.route('/uploads/<filename>')
+@app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # nginx sends the bytes in x-accel mode (see media.py)
+    return media.send_upload(filename)
 
 # ============= STATS/ANALYTICS ROUTES =============
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    stats = {
-        "total_projects": Project.query.count(),
-        "total_views": db.session.query(db.func.sum(Project.views)).scalar() or 0,
-        "total_likes": db.session.query(db.func.sum(Project.likes)).scalar() or 0,
-        "total_articles": Article.query.filter_by(published=True).count(),
-        "total_skills": Skill.query.count(),
-        "total_comments": Comment.query.filter_by(approved=True).count(),
-        "unread_messages": Contact.query.filter_by(read=False).count(),
-        "status": "ok"
-    }
+    # One primary-key read; buffered views are added from memory
+    stats = site_stats.read().to_json()
+    stats['total_views'] += view_counter.pending(SiteStats, site_stats.SITE_STATS_ID, 'total_views')
+    stats["status"] = "ok"
+    return jsonify(stats)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    stats = response_cache.stats()
+    stats['row_fragments'] = row_fragments.stats()
     return jsonify(stats)
 
 @app.route('/api/dashboard', methods=['GET'])
 def get_dashboard():
+    cards = Project.card_fields
+    projects = Project.query.options(*Project.load_options(cards, Project.views))
+    
     # Recent projects
-    recent_projects = Project.query.order_by(Project.created_at.desc()).limit(5).all()
+    recent_projects = projects.order_by(Project.created_at.desc()).limit(5).all()
     
     # Recent comments (unapproved)
     recent_comments = Comment.query.filter_by(approved=False).order_by(Comment.created_at.desc()).limit(5).all()
@@ -540,35 +847,51 @@ def get_dashboard():
     recent_contacts = Contact.query.filter_by(read=False).order_by(Contact.created_at.desc()).limit(5).all()
     
     # Popular projects
-    popular_projects = Project.query.order_by(Project.views.desc()).limit(5).all()
+    popular_projects = projects.order_by(Project.views.desc()).limit(5).all()
     
     return jsonify({
-        "recent_projects": [p.to_json() for p in recent_projects],
+        "recent_projects": [p.to_json(cards) for p in recent_projects],
         "recent_comments": [c.to_json() for c in recent_comments],
         "recent_contacts": [c.to_json() for c in recent_contacts],
-        "popular_projects": [p.to_json() for p in popular_projects]
+        "popular_projects": [p.to_json(cards) for p in popular_projects]
     })
 
-# Serve Frontend files
+# ============= HOME BUNDLE =============
+
+# Sections of the public homepage, fetched by script.js in one request. Each
+# one goes through its own endpoint (and so its cache entry and invalidation)
+# and its JSON body is spliced in without being decoded again.
+HOME_SECTIONS = [
+    ('stats', '/api/stats'),
+    ('categories', '/api/categories'),
+    ('projects', '/api/projects?page=1&per_page=9&sort=created_at'),
+    ('skills', '/api/skills'),
+    ('experiences', '/api/experiences'),
+    ('articles', '/api/articles?per_page=6')
+]
+
+def render_section(path):
+    """Body of an internal GET to ``path``, without a network round trip"""
+    with app.test_request_context(path):
+        view = app.view_functions[request.url_rule.endpoint]
+        return make_response(view(**request.view_args)).get_data()
+
+@app.route('/api/home', methods=['GET'])
+def get_home():
+    parts = [b'"%s":%s' % (name.encode(), render_section(path)) for name, path in HOME_SECTIONS]
+    return app.response_class(b'{' + b','.join(parts) + b'}', mimetype='application/json')
+
+# Serve Frontend files: fingerprinted and held in memory (see assets.py)
 @app.route('/')
-def index():
-    return send_from_directory('../Frontend', 'index.html')
-
-@app.route('/admin.html')
-def admin():
-    return send_from_directory('../Frontend', 'admin.html')
-
-@app.route('/script.js')
-def script():
-    return send_from_directory('../Frontend', 'script.js')
-
 @app.route('/<path:filename>')
-def serve_static(filename):
-    # Serve any file from Frontend directory
-    try:
-        return send_from_directory('../Frontend', filename)
-    except:
-        return send_from_directory('../Frontend', 'index.html')
+def serve_static(filename=''):
+    asset, immutable = assets.lookup('/' + filename)
+    if asset is None:
+        # SPA fallback, prebuilt; unknown API paths and stale hashes stay 404
+        if filename.startswith(('api/', 'assets/')) or assets.fallback is None:
+            abort(404)
+        asset = assets.fallback
+    return assets.response(asset, immutable)
 
 # Only call init_db if not in serverless environment
 if __name__ == "__main__":
@@ -577,12 +900,15 @@ if __name__ == "__main__":
     print("🚀 Starting Flask backend...")
     app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
 else:
-    # Serverless: lazy init on first request
-    @app.before_request
-    def ensure_db():
-        if not hasattr(app, '_db_initialized'):
-            try:
-                db.create_all()
-                app._db_initialized = True
-            except:
-                pass
+    # Schema changes run in the release phase (python migrate.py). Platforms
+    # without one can set AUTO_MIGRATE=1 to migrate on the first request.
+    if os.environ.get('AUTO_MIGRATE', '').lower() in ('1', 'true', 'yes'):
+        @app.before_request
+        def ensure_db():
+            if not hasattr(app, '_db_initialized'):
+                try:
+                    import migrations
+                    migrations.upgrade(db.engine)
+                    app._db_initialized = True
+                except Exception as e:
+                    print(f"Auto migration failed: {e}")
@@ -0,0 +1,183 @@
+"""Fingerprinted Frontend assets served from memory.
+
+At startup the manifest reads every file in ``Frontend/`` once:
+
+- Assets (``script.js`` ...) get a content-hashed name such as
+  ``/assets/script.3f9c2a71d0.js``. They are served with
+  ``Cache-Control: immutable``, so a browser never asks for them again until
+  the hash changes.
+- HTML pages have their ``src``/``href`` references rewritten to the hashed
+  URLs. They are served with ``Cache-Control: no-cache`` and a content ETag,
+  so a repeat visit is one 304 for the page and no asset requests.
+- Any other path gets the prebuilt ``index.html`` response (SPA fallback)
+  without touching the filesystem.
+
+Each body is kept in identity, gzip and (if installed) brotli encodings.
+Assets reuse the ``.gz``/``.br`` siblings written by precompress.py when they
+are fresh, because hashing does not change their bytes. Pages are rewritten,
+so they are compressed here once. With ``ASSET_RELOAD`` set (or in debug) the
+manifest is rebuilt when a file under ``Frontend/`` changes.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from flask import current_app, request
+
+from compression import COMPRESSIBLE, ENCODINGS, accepted, brotli, compress
+
+PAGES = ('.html',)
+SKIP = ('.backup', '.gz', '.br')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+REFERENCE = re.compile(r'''((?:src|href)\s*=\s*["'])(/?)([^"'?#:]+)(["'?#])''')
+
+
+class Asset:
+    __slots__ = ('mimetype', 'etag', 'bodies')
+
+    def __init__(self, mimetype, etag, bodies):
+        self.mimetype = mimetype
+        self.etag = etag
+        self.bodies = bodies  # encoding -> bytes, 'identity' always present
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def hashed_name(name, digest):
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{digest}{ext}'
+
+
+class AssetManifest:
+    """Logical names and hashed URLs -> in-memory Asset"""
+
+    def __init__(self, app=None, directory=None):
+        self.directory = directory
+        self.prefix = '/assets/'
+        self.reload = False
+        self.urls = {}        # logical name -> hashed URL
+        self.hashed = {}      # hashed name -> Asset
+        self.files = {}       # logical name -> Asset (pages and unhashed assets)
+        self.fallback = None  # index.html
+        self._stamp = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, directory)
+
+    def init_app(self, app, directory=None):
+        self.directory = os.path.abspath(os.path.join(app.root_path, directory or '../Frontend'))
+        self.reload = app.debug or bool(app.config.get('ASSET_RELOAD'))
+        app.extensions['assets'] = self
+        self.build()
+
+    def _sources(self):
+        names = []
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if not filename.endswith(SKIP):
+                    path = os.path.join(root, filename)
+                    names.append(os.path.relpath(path, self.directory).replace(os.sep, '/'))
+        return sorted(names)
+
+    def _snapshot(self):
+        stamp = []
+        for name in self._sources():
+            st = os.stat(os.path.join(self.directory, name))
+            stamp.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def _encode(self, data, mimetype, sibling=None):
+        bodies = {'identity': data}
+        if mimetype not in COMPRESSIBLE:
+            return bodies
+        for encoding, suffix in ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            body = None
+            if sibling is not None:
+                try:
+                    if os.stat(sibling + suffix).st_mtime >= os.stat(sibling).st_mtime:
+                        with open(sibling + suffix, 'rb') as f:
+                            body = f.read()
+                except OSError:
+                    pass
+            if body is None:
+                body = compress(data, encoding, level=11 if encoding == 'br' else 9)
+            if len(body) < len(data):
+                bodies[encoding] = body
+        return bodies
+
+    def build(self):
+        urls, hashed, files = {}, {}, {}
+        pages = []
+        for name in self._sources():
+            path = os.path.join(self.directory, name)
+            mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            if name.endswith(PAGES):
+                pages.append((name, path, mimetype))
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = fingerprint(data)
+            asset = Asset(mimetype, digest, self._encode(data, mimetype, sibling=path))
+            hashed[hashed_name(name, digest)] = asset
+            urls[name] = self.prefix + hashed_name(name, digest)
+            files[name] = asset
+
+        def rewrite(match):
+            url = urls.get(match.group(3))
+            if url is None:
+                return match.group(0)
+            return match.group(1) + url + match.group(4)
+
+        for name, path, mimetype in pages:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = REFERENCE.sub(rewrite, f.read()).encode('utf-8')
+            files[name] = Asset(mimetype, fingerprint(data), self._encode(data, mimetype))
+
+        with self._lock:
+            self.urls, self.hashed, self.files = urls, hashed, files
+            self.fallback = files.get('index.html')
+            self._stamp = self._snapshot() if self.reload else None
+
+    def refresh(self):
+        if self.reload and self._snapshot() != self._stamp:
+            self.build()
+
+    def lookup(self, path):
+        """``(asset, immutable)`` for a request path, or (None, False)"""
+        self.refresh()
+        if path.startswith(self.prefix):
+            asset = self.hashed.get(path[len(self.prefix):])
+            return asset, asset is not None
+        name = path.lstrip('/') or 'index.html'
+        return self.files.get(name), False
+
+    def response(self, asset, immutable=False):
+        encoding = 'identity'
+        for candidate, _ in ENCODINGS:
+            if candidate in asset.bodies and accepted(candidate):
+                encoding = candidate
+                break
+        etag = asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}'
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(asset.bodies[encoding], mimetype=asset.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = IMMUTABLE if immutable else REVALIDATE
+        if len(asset.bodies) > 1:
+            response.vary.add('Accept-Encoding')
+        return response
+
+
+assets = AssetManifest()
@@ -0,0 +1,418 @@
+# Micro-benchmarks for the hot API paths.
+#
+# Runs against a throwaway SQLite database through Flask's test client, so
+# numbers are relative (before vs after), not production latencies.
+#
+#   python benchmark.py views --requests 2000
+#   python benchmark.py likes --threads 8 --requests 200
+#   python benchmark.py pages --rows 20000
+#   python benchmark.py search --rows 100000
+#   python benchmark.py rows --rows 10000
+#   python benchmark.py serialize --rows 1000
+#   python benchmark.py compression
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+
+def load_app(**env):
+    """Import app.py against a fresh SQLite file and return the module"""
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['UPLOAD_FOLDER'] = os.path.join(workdir, 'uploads')
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    import migrations
+    with app_module.app.app_context():
+        migrations.upgrade(app_module.db.engine)
+    return app_module
+
+
+def seed_projects(app_module, count):
+    from models import db, Project
+    with app_module.app.app_context():
+        db.session.add_all([
+            Project(title=f'Project {i}', description='Benchmark project',
+                    long_description='x' * 500, image_url='/uploads/x.png',
+                    tags='web,flask,bench', views=i % 97, likes=i % 31)
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+class WriteCounter:
+    """Counts INSERT/UPDATE/DELETE statements sent to the engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.writes = 0
+        self.commits = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+        event.listen(engine, 'commit', self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
+            self.writes += 1
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed_requests(client, paths):
+    samples = []
+    start = time.perf_counter()
+    for path in paths:
+        t0 = time.perf_counter()
+        response = client.get(path)
+        samples.append((time.perf_counter() - t0) * 1000)
+        assert response.status_code == 200, response.status_code
+    return samples, time.perf_counter() - start
+
+
+def report(label, samples, elapsed, counter=None):
+    line = (f"{label:<28} p50={percentile(samples, 50):7.3f}ms "
+            f"p99={percentile(samples, 99):7.3f}ms  {len(samples) / elapsed:8.0f} req/s")
+    if counter is not None:
+        line += f"  writes={counter.writes} ({counter.writes / elapsed:.0f}/s) commits={counter.commits}"
+    print(line)
+
+
+def bench_views(args):
+    app_module = load_app(VIEW_FLUSH_INTERVAL=3600, VIEW_FLUSH_THRESHOLD=0)
+    from models import db, Project
+    seed_projects(app_module, args.rows)
+    app = app_module.app
+
+    # The pre-buffer handler: load, views += 1, commit per GET
+    @app.route('/bench/legacy/projects/<int:id>')
+    def legacy_get_project(id):
+        project = Project.query.get_or_404(id)
+        project.views += 1
+        db.session.commit()
+        return app_module.jsonify(project.to_json())
+
+    client = app.test_client()
+    paths = [f'/api/projects/{(i % args.rows) + 1}' for i in range(args.requests)]
+    with app.app_context():
+        counter = WriteCounter(db.engine)
+
+    samples, elapsed = timed_requests(client, ['/bench/legacy' + p[4:] for p in paths])
+    report('per-request commit', samples, elapsed, counter)
+
+    counter.writes = counter.commits = 0
+    samples, elapsed = timed_requests(client, paths)
+    t0 = time.perf_counter()
+    rows = app_module.view_counter.flush()
+    flush_ms = (time.perf_counter() - t0) * 1000
+    report('write-behind buffer', samples, elapsed, counter)
+    print(f"{'':<28} final flush: {rows} rows in {flush_ms:.1f}ms")
+
+
+def hammer(app, path, threads, per_thread, distinct_clients=True):
+    """POST ``path`` from several threads at once; returns (ok, errors, seconds)"""
+    barrier = threading.Barrier(threads)
+    results = {'ok': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def worker(n):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(per_thread):
+            agent = f'bench-{n}-{i}' if distinct_clients else 'bench'
+            response = client.post(path, headers={'User-Agent': agent})
+            with lock:
+                results['ok' if response.status_code == 200 else 'errors'] += 1
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return results['ok'], results['errors'], time.perf_counter() - start
+
+
+def bench_likes(args):
+    app_module = load_app()
+    from models import db, Project
+    seed_projects(app_module, 2)
+    app = app_module.app
+    with app.app_context():
+        db.session.execute(db.update(Project).values(likes=0))
+        db.session.commit()
+
+    # The pre-atomic handler: read-modify-write on the ORM object
+    @app.route('/bench/legacy/projects/<int:id>/like', methods=['POST'])
+    def legacy_like_project(id):
+        project = Project.query.get_or_404(id)
+        project.likes += 1
+        db.session.commit()
+        return app_module.jsonify({"likes": project.likes})
+
+    for label, project_id, path in (
+        ('read-modify-write', 1, '/bench/legacy/projects/1/like'),
+        ('atomic increment', 2, '/api/projects/2/like'),
+    ):
+        ok, errors, elapsed = hammer(app, path, args.threads, args.requests)
+        with app.app_context():
+            stored = db.session.get(Project, project_id).likes
+        print(f"{label:<20} sent={ok:5d} stored={stored:5d} lost={ok - stored:4d} "
+              f"errors={errors}  {ok / elapsed:7.0f} likes/s")
+
+    with app.app_context():
+        counter = WriteCounter(db.engine)
+    ok, errors, elapsed = hammer(app, '/api/projects/2/like', args.threads, args.requests,
+                                 distinct_clients=False)
+    print(f"{'repeat clicks':<20} sent={ok:5d} writes={counter.writes:4d}  {ok / elapsed:7.0f} req/s")
+
+
+def bench_pages(args):
+    app_module = load_app(RESPONSE_CACHE_TTL=0)
+    from models import Project
+    from pagination import encode_cursor
+    seed_projects(app_module, args.rows)
+    client = app_module.app.test_client()
+    per_page = 10
+    last_page = args.rows // per_page
+
+    for page in (1, last_page // 2, last_page):
+        offset_path = f'/api/projects?sort=views&per_page={per_page}&page={page}'
+        cursor = ''
+        if page > 1:
+            # Cursor of the last row on the previous page
+            with app_module.app.app_context():
+                row = (Project.query.order_by(Project.views.desc(), Project.id.desc())
+                       .offset((page - 1) * per_page - 1).first())
+                cursor = encode_cursor('views', row.views, row.id)
+        cursor_path = f'/api/projects?sort=views&per_page={per_page}&cursor={cursor}'
+        for label, path in (('offset', offset_path), ('cursor', cursor_path)):
+            samples, elapsed = timed_requests(client, [path] * args.requests)
+            report(f'{label} page {page}', samples, elapsed)
+
+
+def bench_search(args):
+    """ILIKE scan vs the full-text index, query only (no serialization)"""
+    import random
+    app_module = load_app()
+    from models import db, Project
+    import search
+
+    rng = random.Random(42)
+    vocab = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9)))
+             for _ in range(5000)]
+
+    def words(n):
+        return ' '.join(rng.choice(vocab) for _ in range(n))
+
+    with app_module.app.app_context():
+        table = Project.__table__
+        for start in range(0, args.rows, 10000):
+            db.session.execute(table.insert(), [
+                {'title': words(3), 'description': words(20), 'long_description': words(80),
+                 'image_url': '/uploads/x.png', 'tags': ','.join(rng.sample(vocab, 3)),
+                 'views': 0, 'likes': 0}
+                for _ in range(start, min(args.rows, start + 10000))
+            ])
+        db.session.commit()
+        key = str(db.engine.url)
+        terms = [rng.choice(vocab) for _ in range(args.requests)]
+
+        for mode in ('ilike', search.backend()):
+            search._backends[key] = mode
+            samples = []
+            start = time.perf_counter()
+            for term in terms:
+                t0 = time.perf_counter()
+                query = search.apply(Project.query, term, ranked=True)
+                query.paginate(page=1, per_page=9, error_out=False)
+                samples.append((time.perf_counter() - t0) * 1000)
+            report(f'{mode} ({args.rows} rows)', samples, time.perf_counter() - start)
+
+
+def bench_rows(args):
+    """ORM instances vs Core rows mapped to slotted DTOs, CPU and memory per 1000 rows"""
+    import tracemalloc
+    app_module = load_app()
+    from models import db, Category, Project
+    import reads
+    seed_projects(app_module, args.rows)
+    with app_module.app.app_context():
+        db.session.add(Category(name='Web', icon='w'))
+        db.session.execute(db.update(Project).values(category_id=1))
+        db.session.commit()
+
+    def orm_path(fields):
+        projects = Project.query.options(*Project.load_options(fields)).order_by(Project.id).all()
+        return [p.to_json(fields) for p in projects]
+
+    def core_path(fields):
+        stmt, make_row = reads.statement(Project, fields)
+        return [p.to_json(fields) for p in reads.fetch(stmt.order_by(Project.id), make_row)]
+
+    per_k = 1000.0 / args.rows
+    with app_module.app.app_context():
+        for label, fields in (('card', Project.card_fields), ('full', None)):
+            assert orm_path(fields) == core_path(fields)
+            db.session.remove()
+            for name, path in (('orm', orm_path), ('core', core_path)):
+                cpu = []
+                for _ in range(args.repeat):
+                    t0 = time.process_time()
+                    path(fields)
+                    cpu.append((time.process_time() - t0) * 1000 * per_k)
+                    db.session.remove()
+                tracemalloc.start()
+                path(fields)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                db.session.remove()
+                print(f"{name + ' ' + label:<12} cpu={percentile(cpu, 50):7.2f}ms/1k rows  "
+                      f"peak={peak * per_k / 1024:8.1f}KiB/1k rows")
+
+
+def bench_serialize(args):
+    """Encoding project and article list payloads: stdlib, orjson, cached fragments"""
+    import json
+    app_module = load_app()
+    from models import db, Article, Project
+    import encoding
+    import reads
+    from fragments import FragmentCache
+    seed_projects(app_module, args.rows)
+    with app_module.app.app_context():
+        db.session.add_all([
+            Article(title=f'Article {i}', slug=f'article-{i}', content='lorem ipsum ' * 400,
+                    excerpt='Benchmark article', tags='python,flask', published=True)
+            for i in range(args.rows)
+        ])
+        db.session.commit()
+
+    def stdlib(rows, fields):
+        # The previous path: isoformat() per datetime, then the stdlib encoder
+        data = []
+        for row in rows:
+            item = row.to_json(fields)
+            for key in ('created_at', 'updated_at'):
+                if item.get(key):
+                    item[key] = item[key].isoformat()
+            data.append(item)
+        return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    def orjson_dumps(rows, fields):
+        return encoding.dumps([row.to_json(fields) for row in rows])
+
+    fragments = FragmentCache()
+    encoders = [('stdlib', stdlib), ('fragments (warm)', lambda rows, fields: fragments.render(model, rows, fields))]
+    if encoding.orjson is not None:
+        encoders.insert(1, ('orjson', orjson_dumps))
+    else:
+        print('orjson not installed: fragments are encoded with the stdlib')
+
+    per_k = 1000.0 / args.rows
+    with app_module.app.app_context():
+        for model in (Project, Article):
+            fields = model.card_fields
+            stmt, make_row = reads.statement(model, fields, model.updated_at)
+            rows = reads.fetch(stmt, make_row)
+            fragments.render(model, rows, fields)
+            for label, encode in encoders:
+                samples = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    body = encode(rows, fields)
+                    samples.append((time.perf_counter() - t0) * 1000 * per_k)
+                print(f"{model.__tablename__ + ' ' + label:<28} p50={percentile(samples, 50):7.3f}ms/1k rows  "
+                      f"{len(body) * per_k / 1024:7.1f}KiB/1k rows")
+
+
+def bench_compression(args):
+    """Bytes on the wire per encoding for API responses and Frontend assets"""
+    app_module = load_app(RESPONSE_CACHE_TTL=0)
+    from models import db, Article
+    import compression
+    import precompress
+    seed_projects(app_module, 50)
+    with app_module.app.app_context():
+        db.session.add_all([
+            Article(title=f'Article {i}', slug=f'article-{i}', content='lorem ipsum dolor ' * 300,
+                    tags='python,flask', published=True)
+            for i in range(20)
+        ])
+        db.session.commit()
+    # Precompress a copy: the .gz/.br files must not land in the source tree
+    frontend = os.path.join(tempfile.mkdtemp(prefix='bench_'), 'Frontend')
+    shutil.copytree(app_module.assets.directory, frontend)
+    precompress.main([frontend])
+    app_module.assets.init_app(app_module.app, frontend)
+
+    client = app_module.app.test_client()
+    encodings = ['identity', 'gzip'] + (['br'] if compression.brotli is not None else [])
+    paths = ['/api/projects?per_page=50', '/api/articles?per_page=20&fields=*', '/api/home',
+             '/', '/admin.html', '/script.js']
+    print(f"{'':<38}" + ''.join(f"{e:>10}" for e in encodings))
+    for path in paths:
+        sizes = []
+        for encoding in encodings:
+            response = client.get(path, headers={'Accept-Encoding': encoding})
+            assert response.status_code == 200, response.status_code
+            assert response.headers.get('Content-Encoding', 'identity') == encoding, path
+            sizes.append(len(response.get_data()))
+        saved = 100 - 100 * min(sizes) // sizes[0]
+        print(f"{path:<38}" + ''.join(f"{n:>10}" for n in sizes) + f"   -{saved}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Portfolio API micro-benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    views = sub.add_parser('views', help='detail GET latency and DB writes with the view buffer')
+    views.add_argument('--rows', type=int, default=200)
+    views.add_argument('--requests', type=int, default=2000)
+    views.set_defaults(func=bench_views)
+
+    likes = sub.add_parser('likes', help='concurrent likes: lost updates, throughput, dedupe')
+    likes.add_argument('--threads', type=int, default=8)
+    likes.add_argument('--requests', type=int, default=200, help='per thread')
+    likes.set_defaults(func=bench_likes)
+
+    pages = sub.add_parser('pages', help='offset vs cursor pagination at increasing depth')
+    pages.add_argument('--rows', type=int, default=20000)
+    pages.add_argument('--requests', type=int, default=50)
+    pages.set_defaults(func=bench_pages)
+
+    search = sub.add_parser('search', help='ILIKE vs full-text search latency')
+    search.add_argument('--rows', type=int, default=100000)
+    search.add_argument('--requests', type=int, default=50)
+    search.set_defaults(func=bench_search)
+
+    rows = sub.add_parser('rows', help='ORM vs Core read path: CPU and memory per 1000 rows')
+    rows.add_argument('--rows', type=int, default=10000)
+    rows.add_argument('--repeat', type=int, default=5)
+    rows.set_defaults(func=bench_rows)
+
+    serialize = sub.add_parser('serialize', help='JSON encoding of list payloads: stdlib vs orjson vs fragments')
+    serialize.add_argument('--rows', type=int, default=1000)
+    serialize.add_argument('--repeat', type=int, default=20)
+    serialize.set_defaults(func=bench_serialize)
+
+    compress = sub.add_parser('compression', help='bytes on the wire with gzip/brotli')
+    compress.set_defaults(func=bench_compression)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,4 +4,7 @@
 echo "Installing dependencies..."
 pip install -r requirements.txt
 
+echo "Precompressing Frontend assets..."
+python precompress.py
+
 echo "Build completed!"
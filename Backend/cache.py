@@ -0,0 +1,168 @@
+"""Response cache for the public read endpoints.
+
+Lists such as /api/skills or /api/projects only change when an admin edits
+something, so their JSON bodies are cached per route and normalized query
+string. Invalidation is by tag: every cached entry's key embeds the current
+version of its tags (``projects``, ``skills`` ...), and a write handler bumps
+the version, which makes all older entries unreachable at once. Stale entries
+then age out of the LRU or expire by TTL.
+
+The default backend is an in-process LRU with TTL. With ``REDIS_URL`` set,
+entries and tag versions live in Redis and invalidation is seen by every
+worker. When ``init_app`` is given a ``versions`` source (the shared per-table
+counters in versions.py) tags are table names and are bumped by every commit,
+so explicit ``invalidate()`` calls are only needed for out-of-band changes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, make_response, request
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the in-process LRU is the default
+    redis = None
+
+
+class LocalCacheBackend:
+    """Thread-safe LRU of ``key -> (expires_at, body)`` plus tag versions"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tags = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return [self._tags.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = self._tags.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Entries and tag versions shared by every worker through Redis"""
+
+    def __init__(self, url=None, client=None, prefix='cache:'):
+        self._redis = client if client is not None else redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        return self._redis.get(self._prefix + key)
+
+    def set(self, key, body, ttl):
+        self._redis.set(self._prefix + key, body, ex=max(1, int(ttl)))
+
+    def tag_versions(self, tags):
+        versions = self._redis.mget([f'{self._prefix}tag:{tag}' for tag in tags])
+        return [int(v or 0) for v in versions]
+
+    def bump(self, tags):
+        pipe = self._redis.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(f'{self._prefix}tag:{tag}')
+        pipe.execute()
+
+    def clear(self):
+        for key in self._redis.scan_iter(f'{self._prefix}*'):
+            self._redis.delete(key)
+
+
+class ResponseCache:
+    """Caches 200 JSON responses of decorated views, invalidated by tag"""
+
+    def __init__(self, app=None):
+        self.backend = LocalCacheBackend()
+        self.ttl = 60
+        self.versions = None
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, versions=None):
+        self.versions = versions
+        self.ttl = int(app.config.get('RESPONSE_CACHE_TTL', self.ttl))
+        redis_url = app.config.get('REDIS_URL')
+        if redis_url and redis is not None:
+            self.backend = RedisCacheBackend(redis_url)
+        else:
+            self.backend = LocalCacheBackend(int(app.config.get('RESPONSE_CACHE_SIZE', 512)))
+        app.extensions['response_cache'] = self
+
+    def make_key(self, tags):
+        # Same args in any order share an entry; tag versions retire old ones
+        args = urlencode(sorted(request.args.items(multi=True)))
+        if self.versions is not None:
+            versions = self.versions.get(tags)
+        else:
+            versions = self.backend.tag_versions(tags)
+        stamp = ','.join(f'{tag}={v}' for tag, v in zip(tags, versions))
+        return f'{request.path}?{args}|{stamp}'
+
+    def cached(self, *tags, ttl=None):
+        """Decorator for GET views whose output depends only on ``tags``"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.ttl:
+                    return view(*args, **kwargs)
+                key = self.make_key(tags)
+                body = self.backend.get(key)
+                if body is not None:
+                    self.hits += 1
+                    return current_app.response_class(body, mimetype='application/json')
+                self.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and response.mimetype == 'application/json':
+                    self.backend.set(key, response.get_data(), ttl or self.ttl)
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        if self.versions is not None:
+            self.versions.bump(*tags)
+        else:
+            self.backend.bump(tags)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'backend': type(self.backend).__name__
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,86 @@
+"""Content-Encoding for API responses and the Frontend assets.
+
+API responses: an ``after_request`` hook compresses JSON and text bodies of
+at least ``COMPRESS_MIN_SIZE`` bytes. It uses brotli when the client accepts
+it and the ``brotli`` package is installed, and gzip otherwise. Compressed
+responses get ``Vary: Accept-Encoding`` and a weak ETag, the same as nginx's
+gzip module. The conditional GET checks compare weakly, so revalidation
+still answers 304.
+
+Frontend assets: ``precompress.py`` writes ``.br``/``.gz`` siblings at build
+time. The asset manifest (assets.py) serves them from memory, so static
+files cost no compression CPU per request.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip covers every browser
+    brotli = None
+
+COMPRESSIBLE = {
+    'application/json', 'application/javascript', 'text/html', 'text/css',
+    'text/javascript', 'text/plain', 'image/svg+xml'
+}
+
+# Suffix of the precompressed sibling for each encoding, best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5 if level is None else level)
+    return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+
+
+class Compressor:
+    """``after_request`` compression of dynamic responses"""
+
+    def __init__(self, app=None):
+        self.min_size = 1024
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = int(app.config.get('COMPRESS_MIN_SIZE', self.min_size))
+        app.extensions['compression'] = self
+        if self.min_size > 0:
+            app.after_request(self.after_request)
+
+    def choose(self):
+        if brotli is not None and accepted('br'):
+            return 'br'
+        if accepted('gzip'):
+            return 'gzip'
+        return None
+
+    def after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < self.min_size:
+            return response
+        encoding = self.choose()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compressor = Compressor()
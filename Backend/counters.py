@@ -0,0 +1,271 @@
+"""Counters for hot rows: buffered views and deduplicated likes.
+
+Detail endpoints used to bump ``views`` and commit on every GET, turning each
+page view into a write transaction on the same hot rows. ``ViewCounterBuffer``
+collects the increments in process (or in Redis when ``REDIS_URL`` is set) and
+flushes them as one batched ``UPDATE ... SET views = views + n`` per table,
+either every ``VIEW_FLUSH_INTERVAL`` seconds or once ``VIEW_FLUSH_THRESHOLD``
+increments are pending. Pending counts are flushed on interpreter exit so a
+graceful worker shutdown does not drop them.
+
+Likes are written immediately but atomically (``likes = likes + 1`` with
+RETURNING); ``RotatingBloomFilter`` drops repeat clicks from the same client
+before they reach the database.
+"""
+import atexit
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import bindparam, func, update
+
+from models import db
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the in-process store is the default
+    redis = None
+
+
+class LocalCounterStore:
+    """Per-process pending increments keyed by ``(table, column, id)``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+
+    def incr(self, key, n=1):
+        with self._lock:
+            self._counts[key] += n
+
+    def get(self, key):
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def size(self):
+        with self._lock:
+            return len(self._counts)
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(int)
+        return dict(counts)
+
+    def restore(self, counts):
+        with self._lock:
+            for key, n in counts.items():
+                self._counts[key] += n
+
+
+class RedisCounterStore:
+    """Pending increments shared by every worker through one Redis hash."""
+
+    def __init__(self, url, hash_key='counters:pending'):
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._hash_key = hash_key
+
+    @staticmethod
+    def _field(key):
+        return ':'.join(str(part) for part in key)
+
+    @staticmethod
+    def _key(field):
+        table, column, row_id = field.rsplit(':', 2)
+        return (table, column, int(row_id))
+
+    def incr(self, key, n=1):
+        self._redis.hincrby(self._hash_key, self._field(key), n)
+
+    def get(self, key):
+        return int(self._redis.hget(self._hash_key, self._field(key)) or 0)
+
+    def size(self):
+        return self._redis.hlen(self._hash_key)
+
+    def drain(self):
+        # HGETALL + DEL inside MULTI so increments racing the flush land in
+        # the next batch instead of being deleted unseen.
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hgetall(self._hash_key)
+        pipe.delete(self._hash_key)
+        counts, _ = pipe.execute()
+        return {self._key(field): int(n) for field, n in counts.items()}
+
+    def restore(self, counts):
+        pipe = self._redis.pipeline(transaction=False)
+        for key, n in counts.items():
+            pipe.hincrby(self._hash_key, self._field(key), n)
+        pipe.execute()
+
+
+class ViewCounterBuffer:
+    """Buffers counter increments and flushes them in batched UPDATEs."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.store = LocalCounterStore()
+        self.flush_interval = 5.0
+        self.flush_threshold = 500
+        self.flush_listeners = []
+        self.flushes = 0
+        self.rows_flushed = 0
+        self._models = {}
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = float(app.config.get('VIEW_FLUSH_INTERVAL', self.flush_interval))
+        self.flush_threshold = int(app.config.get('VIEW_FLUSH_THRESHOLD', self.flush_threshold))
+        redis_url = app.config.get('REDIS_URL')
+        if redis_url and redis is not None:
+            self.store = RedisCounterStore(redis_url)
+        app.extensions['view_counter'] = self
+        atexit.register(self.flush)
+
+    def register(self, model):
+        self._models[model.__tablename__] = model
+
+    def incr(self, model, row_id, column='views', n=1):
+        self.store.incr((model.__tablename__, column, row_id), n)
+        self._ensure_flusher()
+        if self.flush_threshold and self.store.size() >= self.flush_threshold:
+            self._wakeup.set()
+
+    def pending(self, model, row_id, column='views'):
+        """Increments not yet written for one row, to add on read."""
+        return self.store.get((model.__tablename__, column, row_id))
+
+    def flush(self):
+        """Write every pending increment; returns the number of rows touched."""
+        with self._flush_lock:
+            counts = self.store.drain()
+            if not counts:
+                return 0
+            batches = defaultdict(list)
+            for (table, column, row_id), n in counts.items():
+                if n:
+                    batches[(table, column)].append({'b_id': row_id, 'b_n': n})
+            with self.app.app_context():
+                try:
+                    for (name, column), params in batches.items():
+                        table = self._models[name].__table__
+                        stmt = (
+                            update(table)
+                            .where(table.c.id == bindparam('b_id'))
+                            .values({column: table.c[column] + bindparam('b_n')})
+                        )
+                        db.session.execute(stmt, params)
+                    db.session.commit()
+                except Exception as e:
+                    # Put the counts back so the next flush retries them
+                    db.session.rollback()
+                    self.store.restore(counts)
+                    print(f"View counter flush failed: {e}")
+                    return 0
+                # The counts are committed: a failing listener must not undo
+                # the bookkeeping below or stop the others
+                for listener in self.flush_listeners:
+                    try:
+                        listener(sorted({name for name, _ in batches}))
+                    except Exception as e:
+                        print(f"View counter flush listener failed: {e}")
+            self.flushes += 1
+            self.rows_flushed += len(counts)
+            return len(counts)
+
+    def _ensure_flusher(self):
+        # Started lazily so each forked gunicorn worker gets its own thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            # Anything escaping here (the store unreachable on drain) would
+            # end the thread, and views would pile up for the worker's life
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"View counter flush failed: {e}")
+
+
+view_counter = ViewCounterBuffer()
+
+
+def increment(model, row_id, column, n=1):
+    """Atomic ``column = column + n``; returns the new value, None if no row.
+
+    Runs in the caller's transaction (caller commits), so related writes can
+    commit with it.
+    """
+    table = model.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == row_id)
+        .values({column: func.coalesce(table.c[column], 0) + n})
+        .returning(table.c[column])
+    )
+    return db.session.execute(stmt).scalar_one_or_none()
+
+
+class RotatingBloomFilter:
+    """Approximate "seen recently" set for like dedupe.
+
+    Two Bloom filter generations are kept; every ``window`` seconds the older
+    one is dropped, so a key is remembered for between one and two windows.
+    False positives (a first like treated as a repeat) happen at roughly
+    ``error_rate``; false negatives never do within the window.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.01, window=86400):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.window = window
+        self._lock = threading.Lock()
+        self._current = bytearray((self.num_bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._rotated_at = time.monotonic()
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def _rotate_if_due(self):
+        if time.monotonic() - self._rotated_at >= self.window:
+            self._previous = self._current
+            self._current = bytearray(len(self._previous))
+            self._rotated_at = time.monotonic()
+
+    @staticmethod
+    def _has(bits, positions):
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def add(self, key):
+        """Record ``key``; returns False if it was (probably) already seen."""
+        positions = self._positions(key)
+        with self._lock:
+            self._rotate_if_due()
+            if self._has(self._current, positions) or self._has(self._previous, positions):
+                return False
+            for p in positions:
+                self._current[p >> 3] |= 1 << (p & 7)
+            return True
+
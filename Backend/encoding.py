@@ -0,0 +1,62 @@
+"""JSON encoding for API responses.
+
+``jsonify`` goes through ``app.json``. This provider uses orjson when it is
+installed and the stdlib encoder otherwise. Both produce the same bytes
+layout as Flask's default: sorted keys, compact separators, ASCII-escaped
+output on the stdlib path. Datetimes are written as ISO 8601 by the encoder
+itself, so serializers can hand them over without calling ``isoformat()``
+on every row.
+
+``dumps()`` is the same encoder for callers that need raw bytes (the row
+fragment cache in fragments.py and the spliced /api/home body).
+"""
+import json
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is the fallback
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+def _orjson_default(value):
+    # Types orjson does not know natively (Decimal, UUID subclasses ...)
+    return DefaultJSONProvider.default(value)
+
+
+def dumps(obj):
+    """``obj`` as compact, key-sorted JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class JSONProvider(DefaultJSONProvider):
+    """``app.json`` backed by ``dumps()``; pretty-printing is left to the stdlib"""
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or orjson is None:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None or self._app.debug:
+            return super().response(obj)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def init_app(app):
+    app.json = JSONProvider(app)
+    app.extensions['json_encoding'] = 'orjson' if orjson is not None else 'stdlib'
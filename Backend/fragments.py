@@ -0,0 +1,88 @@
+"""Pre-serialized row fragments for the list endpoints.
+
+A project or article row only changes when its ``updated_at`` moves. That
+includes the counter UPDATEs, because the column's ``onupdate`` fires for
+Core statements too. So the JSON bytes of each row are cached under
+``(table, id, updated_at, fields)``, and a list response is spliced together
+from those bytes. Only new or changed rows are encoded again.
+
+Some rows carry data that changes without touching ``updated_at``. A model
+lists those JSON keys in ``fragment_keys`` (a project's comment count) and
+their values join the key. It lists the tables behind embedded rows in
+``fragment_depends`` (the project category), and their current versions
+(versions.py) join the key too.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+import encoding
+
+
+class FragmentCache:
+    """Thread-safe LRU of ``key -> JSON bytes`` for serialized rows"""
+
+    def __init__(self, app=None):
+        self.max_entries = 20000
+        self.versions = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, versions=None):
+        self.versions = versions
+        self.max_entries = int(app.config.get('ROW_FRAGMENT_CACHE_SIZE', self.max_entries))
+        app.extensions['row_fragments'] = self
+
+    def render(self, model, rows, fields=None):
+        """JSON array bytes of ``row.to_json(fields)`` for ``rows``"""
+        if not self.max_entries:
+            return encoding.dumps([row.to_json(fields) for row in rows])
+        depends = getattr(model, 'fragment_depends', ())
+        stamp = tuple(self.versions.get(depends)) if self.versions is not None and depends else ()
+        prefix = (model.__tablename__, fields, stamp)
+        volatile = [model.json_fields[name] for name in getattr(model, 'fragment_keys', ())
+                    if fields is None or name in fields]
+
+        parts = []
+        entries = self._entries
+        for row in rows:
+            key = (prefix, row.id, row.updated_at, *[field(row) for field in volatile])
+            with self._lock:
+                body = entries.get(key)
+                if body is not None:
+                    entries.move_to_end(key)
+            if body is None:
+                self.misses += 1
+                body = encoding.dumps(row.to_json(fields))
+                with self._lock:
+                    entries[key] = body
+                    while len(entries) > self.max_entries:
+                        entries.popitem(last=False)
+            else:
+                self.hits += 1
+            parts.append(body)
+        return b'[' + b','.join(parts) + b']'
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+def list_response(key, items, **meta):
+    """JSON object response with ``meta`` plus ``key`` set to the raw ``items`` array"""
+    head = encoding.dumps(meta)
+    body = head[:-1] + (b',' if meta else b'') + b'"%s":' % key.encode() + items + b'}'
+    return current_app.response_class(body, mimetype='application/json')
+
+
+row_fragments = FragmentCache()
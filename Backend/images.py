@@ -0,0 +1,89 @@
+"""Resized variants of uploaded images.
+
+``render()`` runs in the worker processes of media.py's pool, so this module
+only imports Pillow: no Flask, no models, nothing that opens a connection.
+For every upload it writes, next to the original in ``UPLOAD_FOLDER``:
+
+- ``<stem>.<variant>.<format>`` for each width in ``VARIANTS`` (never wider
+  than the original) and each format Pillow was built with, AVIF first;
+- a ``PLACEHOLDER_WIDTH`` px WebP, returned inline as a data URI so a card
+  can paint a blurred preview (LQIP) before the real image arrives.
+
+The names derive from the original's content-addressed name (media.py), so
+variants are as immutable as the upload and share its caching.
+"""
+import base64
+import io
+import os
+
+from PIL import Image, ImageOps, features
+
+VARIANTS = (('thumb', 160), ('card', 640), ('full', 1600))
+FORMATS = tuple(fmt for fmt in ('avif', 'webp') if features.check(fmt))
+QUALITY = {'avif': 50, 'webp': 78}
+PLACEHOLDER_WIDTH = 16
+
+
+def variant_name(filename, variant, fmt):
+    stem = os.path.splitext(filename)[0]
+    return f'{stem}.{variant}.{fmt}'
+
+
+def is_variant(filename):
+    """Whether ``filename`` is a variant written by ``render``"""
+    parts = filename.rsplit('.', 2)
+    return len(parts) == 3 and parts[2] in QUALITY and parts[1] in dict(VARIANTS)
+
+
+def _prepare(image):
+    """Upright RGB(A) copy: applies EXIF rotation, keeps alpha, drops palettes"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+    return image
+
+
+def _resize(image, width):
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def placeholder(image):
+    small = _resize(image, PLACEHOLDER_WIDTH)
+    buffer = io.BytesIO()
+    small.save(buffer, 'WEBP', quality=30)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def render(folder, filename, url_prefix='/uploads/'):
+    """Write every variant of ``folder/filename``.
+
+    Returns a picklable dict for the ``uploads`` row: width, height,
+    ``variants`` as ``{format: [[width, url], ...]}`` smallest first, and
+    the placeholder data URI.
+    """
+    with Image.open(os.path.join(folder, filename)) as source:
+        source.seek(0)  # first frame of an animated GIF/WebP
+        image = _prepare(source)
+        image.load()
+
+    variants = {}
+    written = set()
+    for variant, width in VARIANTS:
+        resized = _resize(image, width)
+        if resized.width in written:
+            continue  # a small original: the larger variants would be copies
+        written.add(resized.width)
+        for fmt in FORMATS:
+            name = variant_name(filename, variant, fmt)
+            resized.save(os.path.join(folder, name), fmt.upper(), quality=QUALITY[fmt])
+            variants.setdefault(fmt, []).append([resized.width, url_prefix + name])
+
+    return {
+        'width': image.width,
+        'height': image.height,
+        'variants': variants,
+        'placeholder': placeholder(image)
+    }
@@ -0,0 +1,299 @@
+"""Delivery of uploaded files.
+
+Streaming an image through ``send_from_directory`` keeps a gunicorn sync
+worker busy for the whole transfer. ``UPLOAD_DELIVERY`` chooses who sends
+the bytes:
+
+- ``x-accel``: Flask only resolves and checks the path and answers with an
+  ``X-Accel-Redirect`` to the internal ``UPLOAD_ACCEL_PREFIX`` location. nginx
+  (nginx/default.conf) then sends the file with sendfile, Range requests and
+  its own caching headers.
+- ``x-sendfile``: the same with an ``X-Sendfile`` header carrying the
+  absolute path, for Apache mod_xsendfile or lighttpd.
+- ``python`` (default, local runs): werkzeug's ``send_file`` with
+  conditional handling. It answers If-Modified-Since/If-None-Match with 304
+  and a Range with 206 or 416.
+
+Storage is content-addressed: ``store_upload`` streams the request body to
+a temporary file in ``CHUNK_SIZE`` pieces while hashing it, then files it
+under its SHA-256 as ``ab/cd/<sha256>.<ext>``. The two prefix levels keep
+each directory small. Identical content is kept once: a repeat upload gets
+the existing URL back. ``uploads.refcount`` counts the projects and
+articles using the file, not the uploads: ``attach`` adds one in the
+transaction that points a row at the URL, ``release`` drops one when a row
+stops using it and deletes the file with its variants once nothing refers
+to it. A stored name never changes content, so every mode lets clients
+cache it for ``UPLOAD_MAX_AGE`` seconds.
+
+Image variants: ``ImagePipeline`` hands each new upload to a process pool
+running ``images.render`` (WebP/AVIF at several widths plus an LQIP
+placeholder). The upload request returns as soon as the job is queued; the
+``uploads`` row goes from ``pending`` to ``ready`` (or ``failed``) when the
+worker finishes, and that commit bumps the ``uploads`` table version so
+cached project and article lists pick up the new ``srcset``.
+"""
+import hashlib
+import mimetypes
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import quote
+
+from flask import abort, current_app, send_from_directory
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+
+import images
+from models import db, Article, Project, Upload
+
+CHUNK_SIZE = 64 * 1024
+INCOMING = '.incoming'  # partial writes, on the same filesystem for os.replace
+
+
+def resolve(filename):
+    """Absolute path of an existing upload, or 404"""
+    folder = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return path
+
+
+def shard_name(digest, ext):
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def copy_hashed(source, target):
+    """Copy a binary stream in chunks while hashing it; returns (sha256, size)"""
+    sha = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+        sha.update(chunk)
+        target.write(chunk)
+        size += len(chunk)
+    return sha.hexdigest(), size
+
+
+def place(temp, folder, name):
+    """Move a finished temporary file to its content-addressed name"""
+    path = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temp, path)
+
+
+def stored(digest):
+    """The Upload holding this content, or None.
+
+    The row is locked until the caller commits: a ``release`` deleting it
+    finishes first, and the caller then finds no row and stores the file
+    again instead of handing out a URL whose file is being removed.
+    """
+    table = Upload.__table__
+    upload_id = db.session.execute(
+        select(table.c.id).where(table.c.sha256 == digest).with_for_update()
+    ).scalar_one_or_none()
+    return db.session.get(Upload, upload_id) if upload_id is not None else None
+
+
+def store_upload(file):
+    """``(upload, created)`` for a werkzeug FileStorage"""
+    folder = current_app.config['UPLOAD_FOLDER']
+    ext = os.path.splitext(secure_filename(file.filename))[1].lower()
+    incoming = os.path.join(folder, INCOMING)
+    os.makedirs(incoming, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=incoming)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            digest, size = copy_hashed(file.stream, f)
+
+        upload = stored(digest)
+        db.session.commit()
+        if upload is not None:
+            return upload, False
+
+        name = shard_name(digest, ext)
+        place(temp, folder, name)
+        upload = Upload(
+            url=f'/uploads/{name}',
+            sha256=digest,
+            refcount=0,
+            content_type=file.mimetype or mimetypes.guess_type(name)[0],
+            size=size,
+            status='pending'
+        )
+        db.session.add(upload)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Same content stored by a concurrent request
+            db.session.rollback()
+            upload = stored(digest)
+            db.session.commit()
+            return upload, False
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+    image_pipeline.enqueue(upload.id, name)
+    return upload, True
+
+
+def attach(url):
+    """Count one more row using an upload, in the caller's transaction
+    (caller commits). Links to anything else are ignored"""
+    if not url or not url.startswith('/uploads/'):
+        return
+    table = Upload.__table__
+    # Locks the row until the commit, so a concurrent release() counts it
+    db.session.execute(update(table).where(table.c.url == url).values(refcount=table.c.refcount + 1))
+
+
+def release(url):
+    """Drop one reference to an upload; deletes it when nothing uses it"""
+    if not url or not url.startswith('/uploads/'):
+        return
+    table = Upload.__table__
+    # The row stays locked until the files are gone: a concurrent upload of
+    # the same content waits in stored(), then finds no row and writes the
+    # file again instead of having it removed from under it
+    row = db.session.execute(
+        select(table.c.id, table.c.refcount, table.c.variants)
+        .where(table.c.url == url).with_for_update()
+    ).first()
+    if row is None:
+        db.session.commit()
+        return
+    db.session.execute(update(table).where(table.c.id == row.id).values(refcount=table.c.refcount - 1))
+    # A miscount must not delete a file a row still uses, so check
+    if row.refcount - 1 > 0 or db.session.execute(select(or_(
+        select(Project.id).where(Project.image_url == url).exists(),
+        select(Article.id).where(Article.cover_image == url).exists()
+    ))).scalar():
+        db.session.commit()
+        return
+    db.session.execute(delete(table).where(table.c.id == row.id))
+    folder = current_app.config['UPLOAD_FOLDER']
+    names = [url[len('/uploads/'):]]
+    for widths in (row.variants or {}).values():
+        names.extend(variant_url[len('/uploads/'):] for _, variant_url in widths)
+    for name in names:
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
+    db.session.commit()
+
+
+def send_upload(filename):
+    config = current_app.config
+    mode = config.get('UPLOAD_DELIVERY', 'python')
+    max_age = config.get('UPLOAD_MAX_AGE', 0)
+    path = resolve(filename)
+
+    if mode == 'python':
+        return send_from_directory(config['UPLOAD_FOLDER'], filename, max_age=max_age)
+
+    # The front server sends the bytes; nothing is read here
+    response = current_app.response_class()
+    response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if mode == 'x-accel':
+        prefix = config.get('UPLOAD_ACCEL_PREFIX', '/_uploads/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(filename)
+    else:
+        response.headers['X-Sendfile'] = path
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
+
+class ImagePipeline:
+    """Variant generation for uploads, off the request threads"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.workers = 1
+        self.jobs = 0
+        self.failures = 0
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = int(app.config.get('IMAGE_WORKERS', self.workers))
+        app.extensions['image_pipeline'] = self
+
+    def _pool(self):
+        # Created lazily so each forked gunicorn worker gets its own pool.
+        # Forked children only run images.render, which never touches the
+        # inherited app or connections.
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pid = os.getpid()
+            return self._executor
+
+    def enqueue(self, upload_id, filename):
+        folder = self.app.config['UPLOAD_FOLDER']
+        self.jobs += 1
+        if self.workers <= 0:
+            # No pool (serverless, scripts): render in this process
+            try:
+                result = images.render(folder, filename)
+            except Exception as e:
+                self._record(upload_id, error=e)
+            else:
+                self._record(upload_id, result)
+            return
+        try:
+            future = self._pool().submit(images.render, folder, filename)
+        except BrokenProcessPool:
+            # A worker died (out of memory on a huge image); start a new pool
+            self._executor = None
+            future = self._pool().submit(images.render, folder, filename)
+        future.add_done_callback(lambda f: self._done(upload_id, f))
+
+    def _done(self, upload_id, future):
+        # Runs on the executor's result thread, outside any request
+        error = future.exception()
+        self._record(upload_id, None if error else future.result(), error)
+
+    def _record(self, upload_id, result=None, error=None):
+        with self.app.app_context():
+            upload = db.session.get(Upload, upload_id)
+            if upload is None:
+                return
+            if error is not None:
+                self.failures += 1
+                upload.status = 'failed'
+                print(f"Image variants failed for {upload.url}: {error}")
+            else:
+                upload.status = 'ready'
+                upload.width = result['width']
+                upload.height = result['height']
+                upload.variants = result['variants']
+                upload.placeholder = result['placeholder']
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Saving image variants failed: {e}")
+
+    def shutdown(self, wait=True):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=wait)
+        self._executor = None
+
+
+image_pipeline = ImagePipeline()
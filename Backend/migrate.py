@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Jalankan migrasi database (release phase, sebelum gunicorn start)
+
+    python migrate.py [upgrade [VERSION] | status | downgrade]
+"""
+import sys
+
+from app import app, db
+import migrations
+
+
+def main(argv):
+    command = argv[0] if argv else 'upgrade'
+    with app.app_context():
+        engine = db.engine
+        if command == 'upgrade':
+            ran = migrations.upgrade(engine, target=argv[1] if len(argv) > 1 else None)
+            if ran:
+                for name in ran:
+                    print(f"✅ Applied {name}")
+            else:
+                print("✅ Database is up to date")
+        elif command == 'status':
+            for name, applied in migrations.status(engine):
+                print(f"{'[x]' if applied else '[ ]'} {name}")
+        elif command == 'downgrade':
+            name = migrations.downgrade(engine)
+            print(f"↩️  Reverted {name}" if name else "Nothing to revert")
+        else:
+            print(__doc__)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,128 @@
+"""Tables as they existed before versioned migrations (db.create_all())
+
+Frozen here instead of built from models.py: later migrations add their own
+columns, indexes and tables, and expect to find this schema and no more.
+Defaults were Python-side in the models, so none appear in the DDL.
+"""
+from sqlalchemy import (MetaData, Table, Column, ForeignKey, BigInteger, Boolean,
+                        DateTime, Integer, String, Text)
+
+metadata = MetaData()
+
+Table(
+    'users', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('username', String(80), unique=True, nullable=False),
+    Column('email', String(120), unique=True, nullable=False),
+    Column('password_hash', String(255), nullable=False),
+    Column('is_admin', Boolean),
+    Column('created_at', DateTime)
+)
+
+Table(
+    'categories', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(50), unique=True, nullable=False),
+    Column('icon', String(50))
+)
+
+Table(
+    'projects', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(100), nullable=False),
+    Column('description', Text, nullable=False),
+    Column('long_description', Text),
+    Column('image_url', String(255), nullable=False),
+    Column('demo_url', String(255)),
+    Column('github_url', String(255)),
+    Column('category_id', Integer, ForeignKey('categories.id')),
+    Column('tags', String(255)),
+    Column('views', Integer),
+    Column('likes', Integer),
+    Column('featured', Boolean),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime)
+)
+
+Table(
+    'skills', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('level', Integer),
+    Column('icon', String(50)),
+    Column('category', String(50))
+)
+
+Table(
+    'experiences', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(100), nullable=False),
+    Column('company', String(100), nullable=False),
+    Column('location', String(100)),
+    Column('start_date', String(20)),
+    Column('end_date', String(20)),
+    Column('description', Text),
+    Column('current', Boolean)
+)
+
+Table(
+    'articles', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(200), nullable=False),
+    Column('slug', String(200), unique=True, nullable=False),
+    Column('content', Text, nullable=False),
+    Column('excerpt', Text),
+    Column('cover_image', String(255)),
+    Column('tags', String(255)),
+    Column('views', Integer),
+    Column('published', Boolean),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime)
+)
+
+Table(
+    'comments', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('project_id', Integer, ForeignKey('projects.id'), nullable=False),
+    Column('name', String(100), nullable=False),
+    Column('email', String(120), nullable=False),
+    Column('message', Text, nullable=False),
+    Column('rating', Integer),
+    Column('approved', Boolean),
+    Column('created_at', DateTime)
+)
+
+Table(
+    'contacts', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('email', String(120), nullable=False),
+    Column('subject', String(200)),
+    Column('message', Text, nullable=False),
+    Column('read', Boolean),
+    Column('created_at', DateTime)
+)
+
+Table(
+    'site_stats', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('total_projects', Integer, nullable=False),
+    Column('total_views', Integer, nullable=False),
+    Column('total_likes', Integer, nullable=False),
+    Column('total_articles', Integer, nullable=False),
+    Column('total_skills', Integer, nullable=False),
+    Column('total_comments', Integer, nullable=False),
+    Column('unread_messages', Integer, nullable=False),
+    Column('updated_at', DateTime)
+)
+
+Table(
+    'table_versions', metadata,
+    Column('name', String(50), primary_key=True),
+    Column('version', BigInteger, nullable=False)
+)
+
+
+def upgrade(conn):
+    # checkfirst: existing deployments already have most of these tables
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,28 @@
+"""Indexes for the filters and sorts used by the list and stats endpoints"""
+from migrations import create_index, drop_index
+
+INDEXES = [
+    # Project list sorts, each with id as keyset tie-breaker
+    ('ix_projects_created_at_id', 'projects', ['created_at', 'id']),
+    ('ix_projects_views_id', 'projects', ['views', 'id']),
+    ('ix_projects_likes_id', 'projects', ['likes', 'id']),
+    ('ix_projects_title_id', 'projects', ['title', 'id']),
+    ('ix_projects_category_id', 'projects', ['category_id']),
+    ('ix_projects_featured', 'projects', ['featured']),
+    # Approved comments per project, newest first; also comments_count
+    ('ix_comments_project_approved_created', 'comments', ['project_id', 'approved', 'created_at']),
+    # Unread contacts / dashboard
+    ('ix_contacts_read_created', 'contacts', ['read', 'created_at']),
+    # Published article list
+    ('ix_articles_published_created', 'articles', ['published', 'created_at', 'id']),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, _, _ in INDEXES:
+        drop_index(conn, name)
@@ -0,0 +1,52 @@
+"""Full-text search index over projects (see search.py)"""
+from sqlalchemy import text
+
+from migrations import add_column, drop_index
+
+TSVECTOR = """tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(tags, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(long_description, '')), 'C')
+) STORED"""
+
+FTS5_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, title, description, long_description, tags)
+        VALUES (new.id, new.title, new.description, new.long_description, new.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, title, description, long_description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.long_description, old.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF title, description, long_description, tags ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, title, description, long_description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.long_description, old.tags);
+        INSERT INTO projects_fts(rowid, title, description, long_description, tags)
+        VALUES (new.id, new.title, new.description, new.long_description, new.tags);
+    END""",
+]
+
+
+def upgrade(conn):
+    if conn.dialect.name == 'postgresql':
+        add_column(conn, 'projects', 'search_vector', TSVECTOR)
+        conn.execute(text('CREATE INDEX IF NOT EXISTS ix_projects_search ON projects USING GIN (search_vector)'))
+    elif conn.dialect.name == 'sqlite':
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+            "title, description, long_description, tags, content='projects', content_rowid='id')"
+        ))
+        for ddl in FTS5_TRIGGERS:
+            conn.execute(text(ddl))
+        conn.execute(text("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')"))
+
+
+def downgrade(conn):
+    if conn.dialect.name == 'postgresql':
+        drop_index(conn, 'ix_projects_search')
+        conn.execute(text('ALTER TABLE projects DROP COLUMN IF EXISTS search_vector'))
+    elif conn.dialect.name == 'sqlite':
+        for name in ('projects_fts_ai', 'projects_fts_ad', 'projects_fts_au'):
+            conn.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+        conn.execute(text('DROP TABLE IF EXISTS projects_fts'))
@@ -0,0 +1,103 @@
+"""Normalized tags: tags / project_tags / article_tags, backfilled from the CSV columns
+
+Frozen like 0001: the tables and the CSV parsing are as of this migration.
+"""
+from sqlalchemy import MetaData, Table, Column, ForeignKey, Index, Integer, String, select
+
+BATCH_SIZE = 500
+
+metadata = MetaData()
+
+# Only what the backfill reads; the foreign keys below need them to resolve
+projects = Table(
+    'projects', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('tags', String(255))
+)
+
+articles = Table(
+    'articles', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('tags', String(255))
+)
+
+tags = Table(
+    'tags', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(50), unique=True, nullable=False)
+)
+
+project_tags = Table(
+    'project_tags', metadata,
+    Column('project_id', Integer, ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    Index('ix_project_tags_tag_project', 'tag_id', 'project_id')
+)
+
+article_tags = Table(
+    'article_tags', metadata,
+    Column('article_id', Integer, ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    Index('ix_article_tags_tag_article', 'tag_id', 'article_id')
+)
+
+
+def _parse(value):
+    """'Web, flask,,Flask' -> ['web', 'flask'] (order kept)"""
+    names = []
+    for part in (value or '').split(','):
+        name = part.strip()[:50].lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _tag_ids(conn, names, cache):
+    missing = [name for name in names if name not in cache]
+    if missing:
+        for row in conn.execute(select(tags.c.id, tags.c.name).where(tags.c.name.in_(missing))):
+            cache[row.name] = row.id
+        for name in missing:
+            if name not in cache:
+                cache[name] = conn.execute(tags.insert().values(name=name)).inserted_primary_key[0]
+    return [cache[name] for name in names]
+
+
+def _backfill(conn, source, links, owner_column, cache):
+    """Parse ``source.tags`` in id-ordered batches into ``links``; skips existing links"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(source.c.id, source.c.tags)
+            .where(source.c.id > last_id)
+            .order_by(source.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        existing = set(conn.execute(
+            select(links.c[owner_column], links.c.tag_id)
+            .where(links.c[owner_column].in_([row.id for row in rows]))
+        ).all())
+        new_links = []
+        for row in rows:
+            names = _parse(row.tags)
+            for tag_id in _tag_ids(conn, names, cache):
+                if (row.id, tag_id) not in existing:
+                    existing.add((row.id, tag_id))
+                    new_links.append({owner_column: row.id, 'tag_id': tag_id})
+        if new_links:
+            conn.execute(links.insert(), new_links)
+
+
+def upgrade(conn):
+    metadata.create_all(conn, tables=[tags, project_tags, article_tags], checkfirst=True)
+    cache = {}
+    _backfill(conn, projects, project_tags, 'project_id', cache)
+    _backfill(conn, articles, article_tags, 'article_id', cache)
+
+
+def downgrade(conn):
+    # The CSV columns were never dropped, so no data is lost here
+    metadata.drop_all(conn, tables=[project_tags, article_tags, tags], checkfirst=True)
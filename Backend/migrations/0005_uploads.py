@@ -0,0 +1,28 @@
+"""Uploads metadata: one row per uploaded image with its resized variants
+
+Frozen like 0001: the content-address columns come with 0006.
+"""
+from sqlalchemy import MetaData, Table, Column, DateTime, Integer, JSON, String, Text
+
+uploads = Table(
+    'uploads', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('url', String(255), unique=True, nullable=False),
+    Column('content_type', String(100)),
+    Column('size', Integer),
+    Column('width', Integer),
+    Column('height', Integer),
+    Column('status', String(20), nullable=False),
+    Column('variants', JSON),
+    Column('placeholder', Text),
+    Column('created_at', DateTime)
+)
+
+
+def upgrade(conn):
+    uploads.create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    # Variant files stay on disk; only their bookkeeping is dropped
+    uploads.drop(conn, checkfirst=True)
@@ -0,0 +1,159 @@
+"""Content-addressed uploads: sha256/refcount columns, flat files moved into shards
+
+Files written before this change sit directly in ``UPLOAD_FOLDER`` as
+``<timestamp>_<name>``. Each one is hashed and hard-linked to its
+content-addressed name, and copies with the same content are collapsed into
+one row. Project and article links are rewritten, and refcount set to the
+number of rows that use each file (media.attach keeps it from then on).
+The old names stay as hard links to the same inode, so URLs handed out
+earlier keep working without using more disk. Variants are rendered again
+under the new names, in this process, since the release phase has no pool.
+"""
+import mimetypes
+import os
+
+from flask import current_app
+from sqlalchemy import (MetaData, Table, Column, DateTime, Integer, JSON, String, Text,
+                        func, select, text)
+
+import images
+from media import CHUNK_SIZE, INCOMING, copy_hashed, shard_name
+from migrations import add_column
+
+# Frozen like 0001: only what this migration reads and writes, as of 0006
+metadata = MetaData()
+
+uploads = Table(
+    'uploads', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('url', String(255), unique=True, nullable=False),
+    Column('sha256', String(64)),
+    Column('refcount', Integer, nullable=False),
+    Column('content_type', String(100)),
+    Column('size', Integer),
+    Column('width', Integer),
+    Column('height', Integer),
+    Column('status', String(20), nullable=False),
+    Column('variants', JSON),
+    Column('placeholder', Text),
+    Column('created_at', DateTime)
+)
+
+projects = Table(
+    'projects', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('image_url', String(255))
+)
+
+articles = Table(
+    'articles', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('cover_image', String(255))
+)
+
+
+class _Discard:
+    def write(self, chunk):
+        pass
+
+
+def _legacy_files(folder):
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path) and not name.startswith('.') and not images.is_variant(name):
+            yield name, path
+
+
+def _link(source, target):
+    if os.path.exists(target):
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:  # no hard links on this filesystem
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                dst.write(chunk)
+
+
+def _replace_with_link(folder, stored_name, path):
+    """A temporary hard link to the stored copy, to os.replace over ``path``"""
+    temp = os.path.join(folder, INCOMING, os.path.basename(path))
+    _remove(temp)
+    _link(os.path.join(folder, stored_name), temp)
+    return temp
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def upgrade(conn):
+    add_column(conn, 'uploads', 'sha256', 'VARCHAR(64)')
+    add_column(conn, 'uploads', 'refcount', 'INTEGER NOT NULL DEFAULT 1')
+    conn.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS ix_uploads_sha256 ON uploads (sha256)'))
+
+    folder = current_app.config['UPLOAD_FOLDER']
+    if not os.path.isdir(folder):
+        return
+    os.makedirs(os.path.join(folder, INCOMING), exist_ok=True)
+    rows = {row.url: row for row in conn.execute(select(uploads).where(uploads.c.sha256.is_(None)))}
+    by_digest = {}  # sha256 -> (upload id, new name)
+
+    for name, path in _legacy_files(folder):
+        with open(path, 'rb') as f:
+            digest, size = copy_hashed(f, _Discard())
+        new_name = shard_name(digest, os.path.splitext(name)[1].lower())
+        old_url, new_url = f'/uploads/{name}', f'/uploads/{new_name}'
+        old = rows.get(old_url)
+
+        if digest not in by_digest:
+            existing = conn.execute(select(uploads.c.id, uploads.c.url).where(uploads.c.sha256 == digest)).first()
+            if existing is not None:
+                by_digest[digest] = (existing.id, existing.url[len('/uploads/'):])
+
+        if digest in by_digest:
+            # A duplicate: one stored file
+            upload_id, new_name = by_digest[digest]
+            new_url = f'/uploads/{new_name}'
+            if old is not None:
+                conn.execute(uploads.delete().where(uploads.c.id == old.id))
+            # Keep the legacy name, as a link to the stored copy
+            os.replace(_replace_with_link(folder, new_name, path), path)
+        else:
+            _link(path, os.path.join(folder, new_name))
+            values = dict(url=new_url, sha256=digest, refcount=0, size=size,
+                          content_type=mimetypes.guess_type(name)[0],
+                          status='pending', variants=None, placeholder=None)
+            if old is not None:
+                upload_id = old.id
+                conn.execute(uploads.update().where(uploads.c.id == upload_id).values(**values))
+            else:
+                upload_id = conn.execute(uploads.insert().values(**values)).inserted_primary_key[0]
+            by_digest[digest] = (upload_id, new_name)
+
+        for table, column in ((projects, 'image_url'), (articles, 'cover_image')):
+            conn.execute(table.update().where(table.c[column] == old_url).values({column: new_url}))
+        if old is not None:
+            for widths in (old.variants or {}).values():
+                for _, variant_url in widths:
+                    _remove(os.path.join(folder, variant_url[len('/uploads/'):]))
+
+    for upload_id, new_name in by_digest.values():
+        url = f'/uploads/{new_name}'
+        using = sum(conn.execute(select(func.count()).select_from(table)
+                                 .where(table.c[column] == url)).scalar()
+                    for table, column in ((projects, 'image_url'), (articles, 'cover_image')))
+        conn.execute(uploads.update().where(uploads.c.id == upload_id).values(refcount=using))
+        status = conn.execute(select(uploads.c.status).where(uploads.c.id == upload_id)).scalar()
+        if status == 'ready':
+            continue
+        try:
+            values = dict(images.render(folder, new_name), status='ready')
+        except Exception as e:
+            print(f"Image variants failed for {new_name}: {e}")
+            values = {'status': 'failed'}
+        conn.execute(uploads.update().where(uploads.c.id == upload_id).values(**values))
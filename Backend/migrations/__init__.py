@@ -0,0 +1,107 @@
+"""Versioned schema migrations.
+
+Each migration is a module ``NNNN_description.py`` in this package with an
+``upgrade(conn)`` function (and optionally ``downgrade(conn)``). Applied
+versions are recorded in ``schema_migrations``; every migration runs in its
+own transaction. Migrations are written to be idempotent (``IF NOT EXISTS``,
+column checks) so databases that predate this package, built by
+``db.create_all()``, can be brought under version control without data loss.
+
+Run them in the release phase, not at request time:
+
+    python migrate.py            # apply pending migrations
+    python migrate.py status
+    python migrate.py downgrade  # revert the latest one
+"""
+import importlib
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(4) PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP NOT NULL
+)
+"""
+
+
+def discover():
+    """All migrations on disk as ``[(version, name, module)]`` in order"""
+    found = []
+    for filename in sorted(os.listdir(os.path.dirname(__file__))):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            module = importlib.import_module(f'{__name__}.{filename[:-3]}')
+            found.append((match.group(1), match.group(2), module))
+    return found
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA_MIGRATIONS_DDL))
+        return {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to ``target``; returns the versions applied"""
+    done = applied_versions(engine)
+    ran = []
+    for version, name, module in discover():
+        if version in done:
+            continue
+        if target is not None and version > target:
+            break
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)'),
+                {'v': version, 'n': name, 't': datetime.utcnow()}
+            )
+        ran.append(f'{version}_{name}')
+    return ran
+
+
+def downgrade(engine):
+    """Revert the most recently applied migration; returns its name or None"""
+    done = applied_versions(engine)
+    for version, name, module in reversed(discover()):
+        if version not in done:
+            continue
+        if not hasattr(module, 'downgrade'):
+            raise RuntimeError(f'{version}_{name} cannot be reverted')
+        with engine.begin() as conn:
+            module.downgrade(conn)
+            conn.execute(text('DELETE FROM schema_migrations WHERE version = :v'), {'v': version})
+        return f'{version}_{name}'
+    return None
+
+
+def status(engine):
+    done = applied_versions(engine)
+    return [(f'{version}_{name}', version in done) for version, name, _ in discover()]
+
+
+# ----- helpers for migration modules -----
+
+def has_column(conn, table, column):
+    return any(c['name'] == column for c in inspect(conn).get_columns(table))
+
+
+def add_column(conn, table, column, ddl):
+    """``ALTER TABLE ... ADD COLUMN`` unless the column already exists"""
+    if not has_column(conn, table, column):
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def create_index(conn, name, table, columns):
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})'))
+
+
+def drop_index(conn, name):
+    conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
@@ -1,10 +1,75 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy.orm import joinedload, load_only
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
-class User(db.Model):
+def split_csv(value):
+    return value.split(',') if value else []
+
+def related_json(value):
+    return value.to_json() if value else None
+
+class Field:
+    """One ``to_json`` key: the attribute it reads and the columns it needs"""
+    
+    def __init__(self, attr, convert=None, columns=None, related=None):
+        self.attr = attr
+        self.convert = convert
+        self.columns = columns if columns is not None else (attr,)
+        self.related = related  # relationship joined in when the key is requested
+    
+    def __call__(self, obj):
+        value = getattr(obj, self.attr)
+        return self.convert(value) if self.convert else value
+
+class Serializer:
+    """Sparse fieldsets for ``to_json``.
+    
+    ``json_fields`` maps each output key to a Field, in output order. Views
+    turn ``?fields=a,b`` into a key tuple with ``parse_fields`` and pass
+    ``load_options`` to the query, so columns behind unrequested keys (long
+    Text bodies in particular) are never selected. ``card_fields`` is the
+    lean default for list endpoints; ``?fields=*`` asks for everything.
+    """
+    __slots__ = ()  # keeps the row DTOs in reads.py slotted
+    json_fields = {}
+    card_fields = None
+    
+    def to_json(self, fields=None):
+        spec = self.json_fields
+        return {key: spec[key](self) for key in (fields or spec)}
+    
+    @classmethod
+    def parse_fields(cls, value, default=None):
+        """Known keys of a ``?fields=`` value; None means every field"""
+        if value is None:
+            return default
+        if value.strip() == '*':
+            return None
+        requested = {key.strip() for key in value.split(',')}
+        # In json_fields order, so every spelling of a field set is one cache key
+        keys = tuple(key for key in cls.json_fields if key in requested)
+        return keys or default
+    
+    @classmethod
+    def load_options(cls, fields=None, *extra):
+        """load_only() for the columns behind ``fields`` (plus ``extra``
+        attributes such as a sort key) and joinedload() for relationships"""
+        columns = {}
+        related = {}
+        for key in fields or cls.json_fields:
+            field = cls.json_fields[key]
+            for name in field.columns:
+                columns[name] = getattr(cls, name)
+            if field.related:
+                related[field.related] = joinedload(getattr(cls, field.related))
+        for attr in extra:
+            columns[attr.key] = attr
+        return [load_only(*columns.values()), *related.values()]
+
+class User(Serializer, db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -19,29 +84,101 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
-    def to_json(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'is_admin': self.is_admin
-        }
+    json_fields = {
+        'id': Field('id'),
+        'username': Field('username'),
+        'email': Field('email'),
+        'is_admin': Field('is_admin')
+    }
+
+# Normalized tags. The comma-joined ``tags`` columns stay as the display copy
+# (and feed full-text search); these tables back ?tag= filters and /api/tags.
+project_tags = db.Table(
+    'project_tags',
+    db.Column('project_id', db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_project_tags_tag_project', 'tag_id', 'project_id')
+)
 
-class Category(db.Model):
+article_tags = db.Table(
+    'article_tags',
+    db.Column('article_id', db.Integer, db.ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_article_tags_tag_article', 'tag_id', 'article_id')
+)
+
+class Tag(Serializer, db.Model):
+    __tablename__ = 'tags'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+    
+    json_fields = {
+        'id': Field('id'),
+        'name': Field('name')
+    }
+
+class Upload(Serializer, db.Model):
+    """An uploaded image and the resized variants built for it (media.py)"""
+    __tablename__ = 'uploads'
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(255), unique=True, nullable=False)
+    sha256 = db.Column(db.String(64), unique=True, index=True)  # content address, one file per hash
+    refcount = db.Column(db.Integer, default=0, nullable=False)  # projects/articles using it (media.attach)
+    content_type = db.Column(db.String(100))
+    size = db.Column(db.Integer)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending | ready | failed
+    # {format: [[width, url], ...]}, smallest first
+    variants = db.Column(db.JSON)
+    placeholder = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @property
+    def srcset(self):
+        """``srcset`` of the best generally supported format (WebP), or None"""
+        variants = self.variants or {}
+        widths = variants.get('webp') or next(iter(variants.values()), None)
+        if not widths:
+            return None
+        return ', '.join(f'{url} {width}w' for width, url in widths)
+    
+    json_fields = {
+        'id': Field('id'),
+        'url': Field('url'),
+        'sha256': Field('sha256'),
+        'refcount': Field('refcount'),
+        'content_type': Field('content_type'),
+        'size': Field('size'),
+        'width': Field('width'),
+        'height': Field('height'),
+        'status': Field('status'),
+        'variants': Field('variants'),
+        'srcset': Field('srcset', columns=('variants',)),
+        'placeholder': Field('placeholder'),
+        'created_at': Field('created_at')
+    }
+
+def upload_srcset(upload):
+    return upload.srcset if upload else None
+
+def upload_placeholder(upload):
+    return upload.placeholder if upload else None
+
+class Category(Serializer, db.Model):
     __tablename__ = 'categories'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), unique=True, nullable=False)
     icon = db.Column(db.String(50))
     projects = db.relationship('Project', backref='category', lazy=True)
     
-    def to_json(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'icon': self.icon
-        }
+    json_fields = {
+        'id': Field('id'),
+        'name': Field('name'),
+        'icon': Field('icon')
+    }
 
-class Project(db.Model):
+class Project(Serializer, db.Model):
     __tablename__ = 'projects'
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -58,27 +195,40 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     comments = db.relationship('Comment', backref='project', lazy=True, cascade='all, delete-orphan')
+    tag_set = db.relationship('Tag', secondary=project_tags, lazy=True)
+    image_upload = db.relationship(
+        'Upload', primaryjoin='foreign(Project.image_url) == Upload.url', viewonly=True, lazy=True
+    )
     
-    def to_json(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'long_description': self.long_description,
-            'image': self.image_url,
-            'demo_url': self.demo_url,
-            'github_url': self.github_url,
-            'category': self.category.to_json() if self.category else None,
-            'tags': self.tags.split(',') if self.tags else [],
-            'views': self.views,
-            'likes': self.likes,
-            'featured': self.featured,
-            'comments_count': len(self.comments),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    json_fields = {
+        'id': Field('id'),
+        'title': Field('title'),
+        'description': Field('description'),
+        'long_description': Field('long_description'),
+        'image': Field('image_url'),
+        'srcset': Field('image_upload', upload_srcset, columns=('image_url',), related='image_upload'),
+        'placeholder': Field('image_upload', upload_placeholder, columns=('image_url',), related='image_upload'),
+        'demo_url': Field('demo_url'),
+        'github_url': Field('github_url'),
+        'category': Field('category', related_json, columns=('category_id',), related='category'),
+        'tags': Field('tags', split_csv),
+        'views': Field('views'),
+        'likes': Field('likes'),
+        'featured': Field('featured'),
+        'comments_count': Field('comments_count', lambda n: n or 0),
+        'created_at': Field('created_at'),
+        'updated_at': Field('updated_at')
+    }
+    # Row fragments (fragments.py) also depend on these: comments_count
+    # changes without touching updated_at, the category lives in its own table
+    fragment_keys = ('comments_count',)
+    fragment_depends = ('categories', 'uploads')
+    # What a project card renders: no long_description
+    card_fields = ('id', 'title', 'description', 'image', 'srcset', 'placeholder', 'demo_url',
+                   'github_url', 'category', 'tags', 'views', 'likes', 'featured',
+                   'comments_count', 'created_at')
 
-class Skill(db.Model):
+class Skill(Serializer, db.Model):
     __tablename__ = 'skills'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -86,16 +236,15 @@ class Skill(db.Model):
     icon = db.Column(db.String(50))
     category = db.Column(db.String(50))
     
-    def to_json(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'level': self.level,
-            'icon': self.icon,
-            'category': self.category
-        }
+    json_fields = {
+        'id': Field('id'),
+        'name': Field('name'),
+        'level': Field('level'),
+        'icon': Field('icon'),
+        'category': Field('category')
+    }
 
-class Experience(db.Model):
+class Experience(Serializer, db.Model):
     __tablename__ = 'experiences'
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -106,19 +255,22 @@ class Experience(db.Model):
     description = db.Column(db.Text)
     current = db.Column(db.Boolean, default=False)
     
-    def to_json(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'company': self.company,
-            'location': self.location,
-            'start_date': self.start_date,
-            'end_date': self.end_date if not self.current else 'Present',
-            'description': self.description,
-            'current': self.current
-        }
+    @property
+    def display_end_date(self):
+        return self.end_date if not self.current else 'Present'
+    
+    json_fields = {
+        'id': Field('id'),
+        'title': Field('title'),
+        'company': Field('company'),
+        'location': Field('location'),
+        'start_date': Field('start_date'),
+        'end_date': Field('display_end_date', columns=('end_date', 'current')),
+        'description': Field('description'),
+        'current': Field('current')
+    }
 
-class Article(db.Model):
+class Article(Serializer, db.Model):
     __tablename__ = 'articles'
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -131,23 +283,35 @@ class Article(db.Model):
     published = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    tag_set = db.relationship('Tag', secondary=article_tags, lazy=True)
+    cover_upload = db.relationship(
+        'Upload', primaryjoin='foreign(Article.cover_image) == Upload.url', viewonly=True, lazy=True
+    )
+    # Opening of the body for cards without an excerpt, cut in SQL so lists
+    # never fetch the whole content column
+    preview = db.column_property(db.func.substr(content, 1, 160), deferred=True)
     
-    def to_json(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'slug': self.slug,
-            'content': self.content,
-            'excerpt': self.excerpt,
-            'cover_image': self.cover_image,
-            'tags': self.tags.split(',') if self.tags else [],
-            'views': self.views,
-            'published': self.published,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    json_fields = {
+        'id': Field('id'),
+        'title': Field('title'),
+        'slug': Field('slug'),
+        'content': Field('content'),
+        'excerpt': Field('excerpt'),
+        'preview': Field('preview'),
+        'cover_image': Field('cover_image'),
+        'srcset': Field('cover_upload', upload_srcset, columns=('cover_image',), related='cover_upload'),
+        'placeholder': Field('cover_upload', upload_placeholder, columns=('cover_image',), related='cover_upload'),
+        'tags': Field('tags', split_csv),
+        'views': Field('views'),
+        'published': Field('published'),
+        'created_at': Field('created_at'),
+        'updated_at': Field('updated_at')
+    }
+    fragment_depends = ('uploads',)
+    card_fields = ('id', 'title', 'slug', 'excerpt', 'preview', 'cover_image', 'srcset',
+                   'placeholder', 'tags', 'views', 'published', 'created_at')
 
-class Comment(db.Model):
+class Comment(Serializer, db.Model):
     __tablename__ = 'comments'
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
@@ -158,17 +322,25 @@ class Comment(db.Model):
     approved = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_json(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'name': self.name,
-            'message': self.message,
-            'rating': self.rating,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+    json_fields = {
+        'id': Field('id'),
+        'project_id': Field('project_id'),
+        'name': Field('name'),
+        'message': Field('message'),
+        'rating': Field('rating'),
+        'created_at': Field('created_at')
+    }
+
+# Loaded with the project row as a correlated COUNT instead of materialising
+# every comment through len(self.comments)
+Project.comments_count = db.column_property(
+    db.select(db.func.count(Comment.id))
+    .where(Comment.project_id == Project.id)
+    .correlate_except(Comment)
+    .scalar_subquery()
+)
 
-class Contact(db.Model):
+class Contact(Serializer, db.Model):
     __tablename__ = 'contacts'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -178,13 +350,43 @@ class Contact(db.Model):
     read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    json_fields = {
+        'id': Field('id'),
+        'name': Field('name'),
+        'email': Field('email'),
+        'subject': Field('subject'),
+        'message': Field('message'),
+        'read': Field('read'),
+        'created_at': Field('created_at')
+    }
+
+class SiteStats(db.Model):
+    """Single-row read model behind /api/stats, kept current by write handlers"""
+    __tablename__ = 'site_stats'
+    id = db.Column(db.Integer, primary_key=True)
+    total_projects = db.Column(db.Integer, default=0, nullable=False)
+    total_views = db.Column(db.Integer, default=0, nullable=False)
+    total_likes = db.Column(db.Integer, default=0, nullable=False)
+    total_articles = db.Column(db.Integer, default=0, nullable=False)
+    total_skills = db.Column(db.Integer, default=0, nullable=False)
+    total_comments = db.Column(db.Integer, default=0, nullable=False)
+    unread_messages = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
     def to_json(self):
         return {
-            'id': self.id,
-            'name': self.name,
-            'email': self.email,
-            'subject': self.subject,
-            'message': self.message,
-            'read': self.read,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+            'total_projects': self.total_projects,
+            'total_views': self.total_views,
+            'total_likes': self.total_likes,
+            'total_articles': self.total_articles,
+            'total_skills': self.total_skills,
+            'total_comments': self.total_comments,
+            'unread_messages': self.unread_messages
+        }
+
+
+class TableVersion(db.Model):
+    """Shared per-table write counter behind ETags and cache keys (versions.py)"""
+    __tablename__ = 'table_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, default=0, nullable=False)
@@ -0,0 +1,96 @@
+"""Keyset (cursor) pagination for the list endpoints.
+
+``query.paginate()`` costs an OFFSET scan plus a ``COUNT(*)`` per page, both
+growing with the table. Cursor mode instead remembers the sort value and id
+of the last row served and asks for rows strictly after it, so every page is
+one index range scan no matter how deep it is. Ties on the sort column are
+broken by ``id`` in the same direction, which keeps the order total and
+stable across pages. NULL sort values are ordered as PostgreSQL does by
+default (last ascending, first descending) on every database, so its index
+on the sort column still serves the page.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_, tuple_
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def clamp_per_page(per_page):
+    """``per_page`` from the query string: <= 0 means the default, capped"""
+    if per_page is None or per_page <= 0:
+        return DEFAULT_PER_PAGE
+    return min(per_page, MAX_PER_PAGE)
+
+
+def encode_cursor(sort, value, row_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort, column):
+    """Returns ``(value, id)`` for ``cursor``; raises InvalidCursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or not isinstance(row_id, int):
+            raise InvalidCursor('Cursor does not match sort order')
+        if value is not None and issubclass(column.type.python_type, datetime):
+            value = datetime.fromisoformat(value)
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor('Malformed cursor')
+    return value, row_id
+
+
+def _after(column, id_column, value, row_id, descending):
+    """Rows strictly after ``(value, row_id)`` in page order"""
+    if value is None:
+        # The cursor is inside the NULL block: later NULLs by id, then (when
+        # descending) every non-NULL value
+        same = and_(column.is_(None), id_column < row_id if descending else id_column > row_id)
+        return or_(same, column.isnot(None)) if descending else same
+    after = tuple_(column, id_column)
+    bound = tuple_(value, row_id)
+    if descending or not column.nullable:
+        return after < bound if descending else after > bound
+    # Ascending: the NULL block follows every value
+    return or_(after > bound, column.is_(None))
+
+
+def keyset_paginate(query, model, sort, column, descending, cursor, per_page, fetch=None):
+    """One page after ``cursor`` ('' for the first page); returns (items, next_cursor)
+
+    ``query`` is an ORM query, or a Core select with ``fetch`` turning the
+    limited statement into rows (see reads.py).
+    """
+    id_column = model.id
+    per_page = clamp_per_page(per_page)
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort, column)
+        query = query.filter(_after(column, id_column, value, row_id, descending))
+
+    if descending:
+        query = query.order_by(column.desc().nulls_first(), id_column.desc())
+    else:
+        query = query.order_by(column.asc().nulls_last(), id_column.asc())
+
+    # One extra row tells us whether there is a next page without COUNT(*)
+    query = query.limit(per_page + 1)
+    items = fetch(query) if fetch is not None else query.all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), last.id)
+    return items, next_cursor
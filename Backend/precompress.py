@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Kompres aset Frontend sekali saat build (.gz dan .br di samping file aslinya)
+
+    python precompress.py [--force] [folder]
+
+Folder bawaan adalah ../Frontend. File yang sudah punya salinan terkompresi
+yang lebih baru dilewati.
+"""
+import mimetypes
+import os
+import sys
+
+from compression import COMPRESSIBLE, ENCODINGS, brotli, compress
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Frontend')
+MIN_SIZE = 256
+
+
+def sources(directory):
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(suffixes) or name.endswith('.backup'):
+                continue
+            if mimetypes.guess_type(name)[0] in COMPRESSIBLE:
+                yield os.path.join(root, name)
+
+
+def main(argv):
+    force = '--force' in argv
+    folders = [arg for arg in argv if not arg.startswith('--')]
+    directory = folders[0] if folders else FRONTEND_DIR
+    encodings = [(e, s) for e, s in ENCODINGS if e != 'br' or brotli is not None]
+    if brotli is None:
+        print("⚠️  brotli tidak terpasang, hanya membuat .gz")
+
+    raw_total = sent_total = 0
+    for path in sources(directory):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < MIN_SIZE:
+            continue
+        mtime = os.stat(path).st_mtime
+        best = len(data)
+        for encoding, suffix in encodings:
+            target = path + suffix
+            if not force and os.path.exists(target) and os.stat(target).st_mtime >= mtime:
+                best = min(best, os.path.getsize(target))
+                continue
+            # Build time, so use the strongest settings
+            body = compress(data, encoding, level=11 if encoding == 'br' else 9)
+            with open(target, 'wb') as f:
+                f.write(body)
+            best = min(best, len(body))
+        raw_total += len(data)
+        sent_total += best
+        name = os.path.relpath(path, directory)
+        print(f"📦 {name:<20} {len(data):>8} -> {best:>7} bytes ({100 - 100 * best // len(data)}% lebih kecil)")
+
+    if raw_total:
+        print(f"✅ Total {raw_total} -> {sent_total} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
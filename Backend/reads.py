@@ -0,0 +1,149 @@
+"""Read-only query layer for the hot list endpoints.
+
+Loading ORM instances only to turn them straight into dicts pays for the
+identity map, attribute instrumentation and lazy-load hooks on every row.
+The public lists (projects, articles, skills, experiences, categories)
+instead run Core ``select()``s of just the columns behind the requested
+fields and map each row to a ``__slots__`` DTO. The DTO carries the model's
+``json_fields``, so ``to_json`` output is identical to the ORM path.
+
+Base statements are built once per (model, fields) and kept in
+``_statements``, an LRU of ``STATEMENT_CACHE_SIZE`` entries (``?fields=``
+subsets are client-chosen). Their compiled SQL is then reused through
+SQLAlchemy's compiled cache. The filters added per request (category, search, tags) are
+cheap generative steps on top.
+"""
+import threading
+from collections import OrderedDict
+from math import ceil
+
+from sqlalchemy import func, inspect, select
+
+from models import db, Serializer
+from pagination import clamp_per_page
+
+STATEMENT_CACHE_SIZE = 256
+
+_dto_classes = {}
+_statements = OrderedDict()
+_statements_lock = threading.Lock()
+
+
+def dto_class(model):
+    """Slotted row class for ``model``: one slot per column attribute and
+    per many-to-one relationship, plus the model's plain properties"""
+    cls = _dto_classes.get(model)
+    if cls is None:
+        mapper = inspect(model)
+        slots = [attr.key for attr in mapper.column_attrs]
+        slots += [rel.key for rel in mapper.relationships if not rel.uselist]
+        namespace = {'__slots__': tuple(slots), 'json_fields': model.json_fields}
+        for name, value in vars(model).items():
+            if isinstance(value, property):
+                namespace[name] = value
+        cls = type(f'{model.__name__}Row', (Serializer,), namespace)
+        _dto_classes[model] = cls
+    return cls
+
+
+def _row_factory(cls, columns):
+    """Builds ``cls`` instances from the row values at ``columns`` (name -> index)"""
+    items = tuple(columns.items())
+    new = cls.__new__
+    setter = object.__setattr__
+
+    def make(row):
+        obj = new(cls)
+        for name, index in items:
+            setter(obj, name, row[index])
+        return obj
+    return make
+
+
+def statement(model, fields=None, *extra):
+    """``(select, make_row)`` for the columns behind ``fields`` plus ``extra``
+    attributes (a sort key); many-to-one fields are outer-joined in"""
+    key = (model, fields, tuple(attr.key for attr in extra))
+    with _statements_lock:
+        cached = _statements.get(key)
+        if cached is not None:
+            _statements.move_to_end(key)
+            return cached
+
+    mapper = inspect(model)
+    columns = []
+    own = {}
+    related = []
+
+    def add(expression, name):
+        columns.append(expression.label(name))
+        return len(columns) - 1
+
+    names = [pk.key for pk in mapper.primary_key]
+    for field_key in fields or model.json_fields:
+        field = model.json_fields[field_key]
+        names.extend(field.columns)
+        if field.related and mapper.relationships[field.related] not in related:
+            related.append(mapper.relationships[field.related])
+    names.extend(attr.key for attr in extra)
+    for name in dict.fromkeys(names):
+        own[name] = add(mapper.column_attrs[name].columns[0], name)
+
+    stmt_joins = []
+    nested = []
+    for rel in related:
+        target = rel.mapper
+        indexes = {attr.key: add(attr.columns[0], f'{rel.key}__{attr.key}')
+                   for attr in target.column_attrs}
+        pk_index = indexes[target.primary_key[0].key]
+        nested.append((rel.key, pk_index, _row_factory(dto_class(target.class_), indexes)))
+        stmt_joins.append((target.local_table, rel.primaryjoin))
+
+    stmt = select(*columns).select_from(mapper.local_table)
+    for table, onclause in stmt_joins:
+        stmt = stmt.outerjoin(table, onclause)
+
+    make_own = _row_factory(dto_class(model), own)
+    if nested:
+        def make_row(row):
+            obj = make_own(row)
+            for name, pk_index, make_related in nested:
+                object.__setattr__(obj, name, make_related(row) if row[pk_index] is not None else None)
+            return obj
+    else:
+        make_row = make_own
+
+    with _statements_lock:
+        _statements[key] = (stmt, make_row)
+        while len(_statements) > STATEMENT_CACHE_SIZE:
+            _statements.popitem(last=False)
+    return stmt, make_row
+
+
+def fetch(stmt, make_row):
+    return [make_row(row) for row in db.session.execute(stmt)]
+
+
+class Page:
+    """The parts of Flask-SQLAlchemy's Pagination the list endpoints use"""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = ceil(total / per_page) if total else 0
+        self.has_prev = page > 1
+        self.has_next = page < self.pages
+
+
+def paginate(stmt, make_row, page, per_page):
+    """Clamped like ``query.paginate(error_out=False, max_per_page=MAX_PER_PAGE)``:
+    one COUNT plus one LIMIT/OFFSET select"""
+    page = max(page, 1)
+    per_page = clamp_per_page(per_page)
+    total = db.session.execute(
+        stmt.with_only_columns(func.count()).order_by(None)
+    ).scalar()
+    items = fetch(stmt.limit(per_page).offset((page - 1) * per_page), make_row)
+    return Page(items, page, per_page, total)
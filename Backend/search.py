@@ -0,0 +1,86 @@
+"""Project search.
+
+``title ILIKE '%q%' OR description ILIKE '%q%'`` cannot use a B-tree index,
+so every keystroke in the search box scanned the whole table. Migration 0003
+adds a real full-text index and this module picks whichever one the database
+has:
+
+- Postgres: generated ``projects.search_vector`` tsvector (title, tags,
+  description, long_description) with a GIN index, ranked by ``ts_rank``.
+- SQLite (local runs and benchmarks): ``projects_fts`` FTS5 table kept in
+  sync by triggers, ranked by ``bm25``.
+- anything else, or before the migration has run: the old ILIKE filter.
+
+The last search term is matched as a prefix so results keep up with typing.
+"""
+import re
+
+from sqlalchemy import Float, Integer, false, func, inspect, literal_column, text
+
+from models import db, Project
+
+TOKEN = re.compile(r'[^\W_]+', re.UNICODE)
+MAX_TERMS = 16
+
+_backends = {}
+
+
+def terms(q):
+    return TOKEN.findall(q.lower())[:MAX_TERMS]
+
+
+def backend():
+    """'tsvector', 'fts5' or 'ilike' for the current engine (checked once)"""
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _backends:
+        inspector = inspect(engine)
+        name = 'ilike'
+        if engine.dialect.name == 'postgresql':
+            columns = {c['name'] for c in inspector.get_columns('projects')}
+            if 'search_vector' in columns:
+                name = 'tsvector'
+        elif engine.dialect.name == 'sqlite' and inspector.has_table('projects_fts'):
+            name = 'fts5'
+        _backends[key] = name
+    return _backends[key]
+
+
+def apply(query, q, ranked=False):
+    """Filter ``query`` to projects matching ``q``; order by relevance if ranked"""
+    words = terms(q)
+    if not words:
+        # Only punctuation: nothing can match, rather than everything
+        return query.filter(false())
+
+    mode = backend()
+    if mode == 'tsvector':
+        tsquery = func.to_tsquery('simple', ' & '.join(words[:-1] + [words[-1] + ':*']))
+        vector = literal_column('projects.search_vector')
+        query = query.filter(vector.op('@@')(tsquery))
+        if ranked:
+            query = query.order_by(func.ts_rank(vector, tsquery).desc(), Project.id.desc())
+        return query
+
+    if mode == 'fts5':
+        match = ' '.join([f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*'])
+        hits = (
+            text('SELECT rowid AS id, bm25(projects_fts) AS rank '
+                 'FROM projects_fts WHERE projects_fts MATCH :match')
+            .bindparams(match=match)
+            .columns(id=Integer, rank=Float)
+            .subquery('fts')
+        )
+        query = query.join(hits, hits.c.id == Project.id)
+        if ranked:
+            # bm25: lower is better
+            query = query.order_by(hits.c.rank.asc(), Project.id.desc())
+        return query
+
+    query = query.filter(
+        (Project.title.ilike(f'%{q}%')) |
+        (Project.description.ilike(f'%{q}%'))
+    )
+    if ranked:
+        query = query.order_by(Project.created_at.desc(), Project.id.desc())
+    return query
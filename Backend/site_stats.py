@@ -0,0 +1,80 @@
+"""Incrementally maintained totals for /api/stats.
+
+``/api/stats`` is hit by every homepage load, every admin load and the Render
+health probe, so it reads one ``site_stats`` row by primary key instead of
+running seven aggregates. Write handlers call ``bump()`` inside their own
+transaction; views go through the counter buffer (see counters.py) so the
+single stats row does not become a new hot spot. ``reconcile()``
+recomputes everything from the source tables and corrects any drift:
+
+    python site_stats.py
+"""
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Project, Article, Skill, Comment, Contact, SiteStats
+
+SITE_STATS_ID = 1
+
+
+def compute():
+    """Recompute every total from scratch (the original seven queries)"""
+    return {
+        'total_projects': Project.query.count(),
+        'total_views': db.session.query(db.func.sum(Project.views)).scalar() or 0,
+        'total_likes': db.session.query(db.func.sum(Project.likes)).scalar() or 0,
+        'total_articles': Article.query.filter_by(published=True).count(),
+        'total_skills': Skill.query.count(),
+        'total_comments': Comment.query.filter_by(approved=True).count(),
+        'unread_messages': Contact.query.filter_by(read=False).count()
+    }
+
+
+def reconcile():
+    """Overwrite the stats row with freshly computed totals and commit"""
+    values = compute()
+    row = db.session.get(SiteStats, SITE_STATS_ID)
+    if row is None:
+        row = SiteStats(id=SITE_STATS_ID)
+        db.session.add(row)
+    for key, value in values.items():
+        setattr(row, key, value)
+    row.updated_at = datetime.utcnow()
+    db.session.commit()
+    return row
+
+
+def read():
+    """The stats row, built on first use"""
+    row = db.session.get(SiteStats, SITE_STATS_ID)
+    if row is not None:
+        return row
+    try:
+        return reconcile()
+    except IntegrityError:
+        # A concurrent first read inserted the row; use theirs
+        db.session.rollback()
+        return db.session.get(SiteStats, SITE_STATS_ID)
+
+
+def bump(**deltas):
+    """Add deltas to the stats row in the caller's transaction (caller commits)"""
+    table = SiteStats.__table__
+    values = {key: table.c[key] + delta for key, delta in deltas.items() if delta}
+    if values:
+        # No row yet is fine: read() will build it from the committed data
+        db.session.execute(update(table).where(table.c.id == SITE_STATS_ID).values(values))
+
+
+if __name__ == '__main__':
+    from app import app
+
+    # Run migrate.py first. Buffered views are in neither projects.views nor
+    # total_views yet; whichever worker holds them adds them to both on flush.
+    with app.app_context():
+        stats = reconcile().to_json()
+    print("✅ site_stats reconciled")
+    for key, value in stats.items():
+        print(f"   - {key}: {value}")
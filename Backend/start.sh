@@ -1,5 +1,8 @@
 #!/bin/sh
 # Render.com start script for backend
 
+echo "Running database migrations..."
+python migrate.py
+
 echo "Starting Flask application..."
 python app.py
@@ -0,0 +1,75 @@
+"""Tag parsing and the normalized tag tables (tags, project_tags, article_tags)."""
+from models import db, Tag, Article, project_tags, article_tags
+
+
+def parse(value):
+    """'Web, flask,,Flask' or ['Web', 'flask'] -> ['Web', 'flask'] (order kept)"""
+    if not value:
+        return []
+    parts = value if isinstance(value, (list, tuple)) else str(value).split(',')
+    labels = []
+    seen = set()
+    for part in parts:
+        label = str(part).strip()[:50]
+        if label and label.lower() not in seen:
+            seen.add(label.lower())
+            labels.append(label)
+    return labels
+
+
+def get_or_create(names):
+    """Tag rows for ``names``, creating the missing ones in the session"""
+    if not names:
+        return []
+    existing = {t.name: t for t in Tag.query.filter(Tag.name.in_(names)).all()}
+    tags = []
+    for name in names:
+        tag = existing.get(name)
+        if tag is None:
+            tag = Tag(name=name)
+            db.session.add(tag)
+            existing[name] = tag
+        tags.append(tag)
+    return tags
+
+
+def set_tags(obj, value):
+    """Store tags on a Project/Article: CSV display copy plus normalized links"""
+    labels = parse(value)
+    obj.tags = ','.join(labels)
+    obj.tag_set = get_or_create([label.lower() for label in labels])
+
+
+def has_tag(model, name):
+    """Filter clause: rows of ``model`` tagged ``name`` (EXISTS on the link index)"""
+    return model.tag_set.any(Tag.name == name.strip().lower())
+
+
+def usage_counts():
+    """Every used tag with the number of projects and published articles using it"""
+    projects = (
+        db.session.query(project_tags.c.tag_id, db.func.count().label('n'))
+        .group_by(project_tags.c.tag_id)
+        .subquery()
+    )
+    articles = (
+        db.session.query(article_tags.c.tag_id, db.func.count().label('n'))
+        .join(Article, Article.id == article_tags.c.article_id)
+        .filter(Article.published == True)
+        .group_by(article_tags.c.tag_id)
+        .subquery()
+    )
+    project_count = db.func.coalesce(projects.c.n, 0)
+    article_count = db.func.coalesce(articles.c.n, 0)
+    rows = (
+        db.session.query(Tag.name, project_count, article_count)
+        .outerjoin(projects, projects.c.tag_id == Tag.id)
+        .outerjoin(articles, articles.c.tag_id == Tag.id)
+        .filter((project_count + article_count) > 0)
+        .order_by((project_count + article_count).desc(), Tag.name)
+        .all()
+    )
+    return [
+        {'name': name, 'projects': p, 'articles': a, 'count': p + a}
+        for name, p, a in rows
+    ]
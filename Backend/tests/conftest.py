@@ -0,0 +1,75 @@
+"""Fixtures: app.py against a throwaway SQLite database.
+
+app.py reads its configuration from the environment when it is imported,
+so the environment is set here, before any test imports it. Run from
+Backend/:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+_workdir = tempfile.mkdtemp(prefix='backend_tests_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ['UPLOAD_FOLDER'] = os.path.join(_workdir, 'uploads')
+os.environ['IMAGE_WORKERS'] = '0'
+os.environ['VIEW_FLUSH_INTERVAL'] = '3600'
+os.environ.pop('REDIS_URL', None)
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    import app as app_module
+    import migrations
+    with app_module.app.app_context():
+        migrations.upgrade(app_module.db.engine)
+    return app_module
+
+
+@pytest.fixture
+def app(app_module):
+    """The Flask app with empty tables, inside an app context"""
+    from models import db
+    app_module.view_counter.store.drain()
+    app_module.article_ids.clear()
+    with app_module.app.app_context():
+        names = []
+        for table in reversed(db.metadata.sorted_tables):
+            if table.name != 'table_versions':
+                db.session.execute(table.delete())
+                names.append(table.name)
+        db.session.commit()
+        # Core deletes bump nothing: retire cached responses and rows here
+        app_module.table_versions.bump(*names)
+        yield app_module.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class StatementCounter:
+    """Counts every statement sent to the engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+@pytest.fixture
+def statements(app):
+    from sqlalchemy import event
+    from models import db
+    counter = StatementCounter()
+    event.listen(db.engine, 'before_cursor_execute', counter)
+    yield counter
+    event.remove(db.engine, 'before_cursor_execute', counter)
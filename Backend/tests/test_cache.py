@@ -0,0 +1,86 @@
+"""Response cache (cache.py) on the in-process and the Redis backend"""
+import pytest
+from flask import Flask, jsonify, request
+
+from cache import LocalCacheBackend, RedisCacheBackend, ResponseCache
+
+
+@pytest.fixture(params=['local', 'redis'])
+def backend(request):
+    if request.param == 'local':
+        return LocalCacheBackend()
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisCacheBackend(client=fakeredis.FakeRedis())
+
+
+@pytest.fixture
+def cache(backend):
+    """A ResponseCache on its own tag versions over ``backend``"""
+    cache = ResponseCache()
+    cache.backend = backend
+    return cache
+
+
+@pytest.fixture
+def skills(cache):
+    """``(client, runs)``: test client of an app whose /skills view records its runs"""
+    app = Flask(__name__)
+    runs = []
+
+    @app.route('/skills')
+    @cache.cached('skills')
+    def view():
+        runs.append(request.full_path)
+        return jsonify({'run': len(runs), 'args': request.args.to_dict()})
+
+    return app.test_client(), runs
+
+
+def test_miss_then_hit(cache, skills):
+    client, runs = skills
+    first = client.get('/skills')
+    second = client.get('/skills')
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert len(runs) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_invalidate_retires_entries(cache, skills):
+    client, runs = skills
+    client.get('/skills')
+    cache.invalidate('skills')
+    assert client.get('/skills').get_json()['run'] == 2
+    cache.invalidate('projects')  # another tag leaves the entry alone
+    assert client.get('/skills').get_json()['run'] == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_query_string_is_part_of_the_key(skills):
+    client, runs = skills
+    assert client.get('/skills?category=Backend').get_json()['args'] == {'category': 'Backend'}
+    assert client.get('/skills?category=Frontend').get_json()['args'] == {'category': 'Frontend'}
+    assert client.get('/skills').get_json()['args'] == {}
+    assert len(runs) == 3
+    # The same arguments in another order share an entry
+    client.get('/skills?category=Backend&fields=name')
+    client.get('/skills?fields=name&category=Backend')
+    assert len(runs) == 4
+
+
+def test_app_invalidates_on_table_version_bump(app_module, client, backend, monkeypatch):
+    cache = app_module.response_cache
+    monkeypatch.setattr(cache, 'backend', backend)
+    monkeypatch.setattr(cache, 'ttl', 60)
+    hits = cache.hits
+
+    assert client.get('/api/skills').get_json() == []
+    assert client.get('/api/skills').get_json() == []
+    assert cache.hits == hits + 1
+
+    # The commit bumps the skills version, so the cached list is unreachable
+    assert client.post('/api/skills', json={'name': 'Python'}).status_code == 201
+    assert [skill['name'] for skill in client.get('/api/skills').get_json()] == ['Python']
+    assert cache.hits == hits + 1
+    assert [skill['name'] for skill in client.get('/api/skills').get_json()] == ['Python']
+    assert cache.hits == hits + 2
@@ -0,0 +1,33 @@
+"""Statements per list request must not grow with the page size (no N+1)"""
+import pytest
+
+from models import db, Category, Comment, Project
+
+
+@pytest.fixture
+def projects(app):
+    db.session.add_all([Category(name=f'Category {i}') for i in range(5)])
+    db.session.flush()
+    for i in range(60):
+        project = Project(title=f'Project {i}', description='Test project',
+                          image_url='/uploads/x.png', tags='web,flask',
+                          category_id=i % 5 + 1, views=i, likes=i % 7)
+        db.session.add(project)
+        db.session.flush()
+        db.session.add_all([Comment(project_id=project.id, name='n', email='e', message='m')
+                            for _ in range(i % 4)])
+    db.session.commit()
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('/api/projects?per_page={n}', 2),  # page + count
+    ('/api/projects?per_page={n}&cursor=', 1),
+    ('/api/dashboard', 4),
+])
+def test_list_statements(app_module, client, projects, statements, monkeypatch, path, expected):
+    monkeypatch.setattr(app_module.response_cache, 'ttl', 0)
+    client.get('/api/projects')  # the first request loads the table versions
+    for n in (1, 5, 50):
+        statements.count = 0
+        assert client.get(path.format(n=n)).status_code == 200
+        assert statements.count == expected, f'{path.format(n=n)}: {statements.count} statements'
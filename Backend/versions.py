@@ -0,0 +1,172 @@
+"""Per-table version counters for conditional GETs and cache invalidation.
+
+Every committed write bumps the version of each table it touched (collected
+from the ORM session, plus explicit ``bump()`` calls for Core UPDATEs such as
+likes). The buffered view flush bumps nothing, so view counts in cached
+responses refresh with the next real write. List and detail endpoints derive
+a strong ETag from the versions of the tables they read, so a revalidation
+that matches is answered with ``304 Not Modified`` before ``to_json`` runs
+(at most an existence check on a detail).
+The comparison is weak, as If-None-Match requires, so an ETag that the
+compression hook weakened (compression.py) still revalidates.
+
+Versions have to agree across gunicorn workers, so the shared copy lives in
+Redis when ``REDIS_URL`` is set and in the ``table_versions`` table otherwise.
+Each worker keeps a local dict and re-reads the shared copy at most every
+``TABLE_VERSION_REFRESH`` seconds; its own writes are visible immediately.
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import event, select, update
+
+from models import db, TableVersion
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the database copy is the default
+    redis = None
+
+
+class DatabaseVersionStore:
+    """Shared versions in the ``table_versions`` table"""
+
+    def load(self):
+        with db.engine.connect() as conn:
+            rows = conn.execute(select(TableVersion.name, TableVersion.version))
+            return {name: version for name, version in rows}
+
+    def bump(self, tables):
+        table = TableVersion.__table__
+        versions = {}
+        # Own short transaction: the caller's session has already committed
+        with db.engine.begin() as conn:
+            for name in tables:
+                version = conn.execute(
+                    update(table).where(table.c.name == name)
+                    .values(version=table.c.version + 1)
+                    .returning(table.c.version)
+                ).scalar_one_or_none()
+                if version is None:
+                    version = 1
+                    conn.execute(table.insert().values(name=name, version=version))
+                versions[name] = version
+        return versions
+
+
+class RedisVersionStore:
+    """Shared versions as Redis integers ``versions:<table>``"""
+
+    def __init__(self, url=None, client=None, prefix='versions:'):
+        self._redis = client if client is not None else redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def load(self):
+        keys = list(self._redis.scan_iter(f'{self._prefix}*'))
+        values = self._redis.mget(keys) if keys else []
+        return {key.decode()[len(self._prefix):]: int(v or 0) for key, v in zip(keys, values)}
+
+    def bump(self, tables):
+        pipe = self._redis.pipeline(transaction=False)
+        for name in tables:
+            pipe.incr(self._prefix + name)
+        return dict(zip(tables, pipe.execute()))
+
+
+class TableVersions:
+    """Local view of the shared per-table versions"""
+
+    def __init__(self, app=None):
+        self.store = DatabaseVersionStore()
+        self.refresh = 1.0
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._synced_at = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.refresh = float(app.config.get('TABLE_VERSION_REFRESH', self.refresh))
+        redis_url = app.config.get('REDIS_URL')
+        if redis_url and redis is not None:
+            self.store = RedisVersionStore(redis_url)
+        app.extensions['table_versions'] = self
+        event.listen(db.session, 'before_flush', self._collect)
+        event.listen(db.session, 'after_commit', self._after_commit)
+        event.listen(db.session, 'after_rollback', self._after_rollback)
+
+    def get(self, tables):
+        if time.monotonic() - self._synced_at > self.refresh:
+            self._sync()
+        versions = self._versions
+        return [versions.get(name, 0) for name in tables]
+
+    def bump(self, *tables):
+        if not tables:
+            return
+        try:
+            bumped = self.store.bump(tables)
+        except Exception as e:
+            # A missed bump only delays revalidation until the next write
+            print(f"Table version bump failed: {e}")
+            return
+        with self._lock:
+            for name, version in bumped.items():
+                self._versions[name] = max(version, self._versions.get(name, 0))
+
+    def etag(self, *tables):
+        return 'v' + '.'.join(str(v) for v in self.get(tables))
+
+    def conditional(self, *tables):
+        """Decorator: ETag from ``tables``, 304 on a matching If-None-Match"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                etag = self.etag(*tables)
+                if request.if_none_match.contains_weak(etag):
+                    return self.not_modified(etag)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    response.set_etag(etag)
+                return response
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def not_modified(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    def _sync(self):
+        try:
+            shared = self.store.load()
+        except Exception as e:
+            print(f"Table version sync failed: {e}")
+            shared = {}
+        with self._lock:
+            for name, version in shared.items():
+                if version > self._versions.get(name, 0):
+                    self._versions[name] = version
+            self._synced_at = time.monotonic()
+
+    @staticmethod
+    def _collect(session, flush_context, instances):
+        touched = session.info.setdefault('touched_tables', set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            touched.add(obj.__table__.name)
+
+    def _after_commit(self, session):
+        touched = session.info.pop('touched_tables', None)
+        if touched:
+            self.bump(*sorted(touched))
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop('touched_tables', None)
+
+
+table_versions = TableVersions()
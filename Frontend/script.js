@@ -11,12 +11,7 @@ let searchQuery = '';
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
-    loadStats();
-    loadCategories();
-    loadProjects();
-    loadSkills();
-    loadExperiences();
-    loadArticles();
+    loadHome();
     setupEventListeners();
     setupScrollEffects();
 });
@@ -84,21 +79,49 @@ function setupScrollEffects() {
     });
 }
 
+// Load every homepage section in a single round trip
+async function loadHome() {
+    try {
+        const res = await fetch(`${API_BASE_URL}/home`);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const data = await res.json();
+        
+        renderStats(data.stats);
+        renderCategories(data.categories);
+        renderProjects(data.projects);
+        renderSkills(data.skills);
+        renderExperiences(data.experiences);
+        renderArticles(data.articles);
+    } catch (error) {
+        // Older backend without /api/home: fetch the sections one by one
+        console.error('Error loading home, falling back to per-section requests:', error);
+        loadStats();
+        loadCategories();
+        loadProjects();
+        loadSkills();
+        loadExperiences();
+        loadArticles();
+    }
+}
+
 // Load Stats
 async function loadStats() {
     try {
         const res = await fetch(`${API_BASE_URL}/stats`);
-        const data = await res.json();
-        
-        animateNumber('stat-projects', data.total_projects);
-        animateNumber('stat-views', data.total_views);
-        animateNumber('stat-likes', data.total_likes);
-        animateNumber('stat-articles', data.total_articles);
+        renderStats(await res.json());
     } catch (error) {
         console.error('Error loading stats:', error);
     }
 }
 
+// Render Stats
+function renderStats(data) {
+    animateNumber('stat-projects', data.total_projects);
+    animateNumber('stat-views', data.total_views);
+    animateNumber('stat-likes', data.total_likes);
+    animateNumber('stat-articles', data.total_articles);
+}
+
 // Animate Number
 function animateNumber(id, target) {
     const element = document.getElementById(id);
@@ -121,20 +144,23 @@ function animateNumber(id, target) {
 async function loadCategories() {
     try {
         const res = await fetch(`${API_BASE_URL}/categories`);
-        const categories = await res.json();
-        
-        const filterContainer = document.getElementById('category-filters');
-        filterContainer.innerHTML = categories.map(cat => `
-            <button onclick="filterProjects(${cat.id})" 
-                    class="filter-btn px-4 py-2 rounded-lg bg-gray-700 hover:bg-purple-600 transition text-white whitespace-nowrap">
-                ${cat.icon} ${cat.name}
-            </button>
-        `).join('');
+        renderCategories(await res.json());
     } catch (error) {
         console.error('Error loading categories:', error);
     }
 }
 
+// Render Categories
+function renderCategories(categories) {
+    const filterContainer = document.getElementById('category-filters');
+    filterContainer.innerHTML = categories.map(cat => `
+        <button onclick="filterProjects(${cat.id})" 
+                class="filter-btn px-4 py-2 rounded-lg bg-gray-700 hover:bg-purple-600 transition text-white whitespace-nowrap">
+            ${cat.icon} ${cat.name}
+        </button>
+    `).join('');
+}
+
 // Filter Projects
 function filterProjects(category) {
     currentCategory = category;
@@ -153,7 +179,9 @@ function filterProjects(category) {
 // Load Projects
 async function loadProjects() {
     try {
-        let url = `/api/projects?page=${currentPage}&per_page=9&sort=${currentSort}`;
+        // While searching, the default "Latest" sort shows best matches first
+        const sort = searchQuery && currentSort === 'created_at' ? 'relevance' : currentSort;
+        let url = `/api/projects?page=${currentPage}&per_page=9&sort=${sort}`;
         
         if (currentCategory !== 'all') {
             url += `&category=${currentCategory}`;
@@ -164,24 +192,7 @@ async function loadProjects() {
         }
         
         const res = await fetch(url);
-        const data = await res.json();
-        
-        const container = document.getElementById('project-list');
-        
-        if (data.projects.length === 0) {
-            container.innerHTML = `
-                <div class="col-span-full text-center py-20">
-                    <i class="fas fa-folder-open text-6xl text-gray-600 mb-4"></i>
-                    <p class="text-gray-400 text-xl">No projects found</p>
-                </div>
-            `;
-            return;
-        }
-        
-        container.innerHTML = data.projects.map(project => createProjectCard(project)).join('');
-        
-        // Update pagination
-        updatePagination(data);
+        renderProjects(await res.json());
     } catch (error) {
         console.error('Error loading projects:', error);
         document.getElementById('project-list').innerHTML = `
@@ -193,13 +204,43 @@ async function loadProjects() {
     }
 }
 
+// Render Projects
+function renderProjects(data) {
+    const container = document.getElementById('project-list');
+    
+    if (data.projects.length === 0) {
+        container.innerHTML = `
+            <div class="col-span-full text-center py-20">
+                <i class="fas fa-folder-open text-6xl text-gray-600 mb-4"></i>
+                <p class="text-gray-400 text-xl">No projects found</p>
+            </div>
+        `;
+        return;
+    }
+    
+    container.innerHTML = data.projects.map(project => createProjectCard(project)).join('');
+    
+    // Update pagination
+    updatePagination(data);
+}
+
+// Card image: resized WebP variants via srcset, blurred placeholder until it loads
+const CARD_IMAGE_SIZES = '(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw';
+
+function cardImage(src, srcset, placeholder, alt, classes) {
+    const style = placeholder ? ` style="background: url('${placeholder}') center / cover"` : '';
+    const responsive = srcset ? ` srcset="${srcset}" sizes="${CARD_IMAGE_SIZES}"` : '';
+    return `<img src="${src}"${responsive} alt="${alt}" loading="lazy" decoding="async"${style}
+                     class="${classes}">`;
+}
+
 // Create Project Card
 function createProjectCard(project) {
     return `
         <div class="bg-gray-900 rounded-2xl overflow-hidden hover:transform hover:scale-105 transition duration-300 shadow-xl group">
             <div class="relative overflow-hidden">
-                <img src="${project.image}" alt="${project.title}" 
-                     class="w-full h-56 object-cover group-hover:scale-110 transition duration-300">
+                ${cardImage(project.image, project.srcset, project.placeholder, project.title,
+                    'w-full h-56 object-cover group-hover:scale-110 transition duration-300')}
                 ${project.featured ? '<div class="absolute top-4 right-4 px-3 py-1 bg-yellow-500 text-black text-xs font-bold rounded-full">⭐ Featured</div>' : ''}
                 <div class="absolute inset-0 bg-gradient-to-t from-black/80 to-transparent opacity-0 group-hover:opacity-100 transition duration-300 flex items-end p-6">
                     <div class="flex gap-2">
@@ -302,113 +343,122 @@ function changePage(page) {
 async function loadSkills() {
     try {
         const res = await fetch(`${API_BASE_URL}/skills`);
-        const skills = await res.json();
-        
-        const container = document.getElementById('skills-container');
-        if (skills.length === 0) {
-            container.innerHTML = '<p class="col-span-full text-center text-gray-400">No skills added yet</p>';
-            return;
-        }
-        
-        container.innerHTML = skills.map(skill => `
-            <div class="bg-gray-800 p-6 rounded-xl">
-                <div class="flex justify-between items-center mb-3">
-                    <span class="font-bold">${skill.icon || '🔧'} ${skill.name}</span>
-                    <span class="text-purple-400 font-bold">${skill.level}%</span>
-                </div>
-                <div class="h-3 bg-gray-700 rounded-full overflow-hidden">
-                    <div class="skill-bar h-full bg-gradient-to-r from-purple-500 to-pink-500" 
-                         style="width: ${skill.level}%"></div>
-                </div>
-            </div>
-        `).join('');
+        renderSkills(await res.json());
     } catch (error) {
         console.error('Error loading skills:', error);
     }
 }
 
+// Render Skills
+function renderSkills(skills) {
+    const container = document.getElementById('skills-container');
+    if (skills.length === 0) {
+        container.innerHTML = '<p class="col-span-full text-center text-gray-400">No skills added yet</p>';
+        return;
+    }
+    
+    container.innerHTML = skills.map(skill => `
+        <div class="bg-gray-800 p-6 rounded-xl">
+            <div class="flex justify-between items-center mb-3">
+                <span class="font-bold">${skill.icon || '🔧'} ${skill.name}</span>
+                <span class="text-purple-400 font-bold">${skill.level}%</span>
+            </div>
+            <div class="h-3 bg-gray-700 rounded-full overflow-hidden">
+                <div class="skill-bar h-full bg-gradient-to-r from-purple-500 to-pink-500" 
+                     style="width: ${skill.level}%"></div>
+            </div>
+        </div>
+    `).join('');
+}
+
 // Load Experiences
 async function loadExperiences() {
     try {
         const res = await fetch(`${API_BASE_URL}/experiences`);
-        const experiences = await res.json();
-        
-        const container = document.getElementById('experience-timeline');
-        if (experiences.length === 0) {
-            container.innerHTML = '<p class="text-center text-gray-400">No experience added yet</p>';
-            return;
-        }
-        
-        container.innerHTML = experiences.map(exp => `
-            <div class="relative pl-8 border-l-2 border-purple-500">
-                <div class="absolute -left-3 top-0 w-6 h-6 bg-purple-600 rounded-full border-4 border-gray-900"></div>
-                <div class="bg-gray-800 p-6 rounded-xl">
-                    <div class="flex justify-between items-start mb-2">
-                        <h3 class="text-xl font-bold">${exp.title}</h3>
-                        ${exp.current ? '<span class="px-3 py-1 bg-green-600 text-xs rounded-full">Current</span>' : ''}
-                    </div>
-                    <div class="text-purple-400 font-semibold mb-2">${exp.company}</div>
-                    <div class="text-sm text-gray-400 mb-3">
-                        <i class="fas fa-calendar-alt mr-1"></i> ${exp.start_date} - ${exp.end_date}
-                        ${exp.location ? `<span class="ml-4"><i class="fas fa-map-marker-alt mr-1"></i> ${exp.location}</span>` : ''}
-                    </div>
-                    ${exp.description ? `<p class="text-gray-300">${exp.description}</p>` : ''}
-                </div>
-            </div>
-        `).join('');
+        renderExperiences(await res.json());
     } catch (error) {
         console.error('Error loading experiences:', error);
     }
 }
 
+// Render Experiences
+function renderExperiences(experiences) {
+    const container = document.getElementById('experience-timeline');
+    if (experiences.length === 0) {
+        container.innerHTML = '<p class="text-center text-gray-400">No experience added yet</p>';
+        return;
+    }
+    
+    container.innerHTML = experiences.map(exp => `
+        <div class="relative pl-8 border-l-2 border-purple-500">
+            <div class="absolute -left-3 top-0 w-6 h-6 bg-purple-600 rounded-full border-4 border-gray-900"></div>
+            <div class="bg-gray-800 p-6 rounded-xl">
+                <div class="flex justify-between items-start mb-2">
+                    <h3 class="text-xl font-bold">${exp.title}</h3>
+                    ${exp.current ? '<span class="px-3 py-1 bg-green-600 text-xs rounded-full">Current</span>' : ''}
+                </div>
+                <div class="text-purple-400 font-semibold mb-2">${exp.company}</div>
+                <div class="text-sm text-gray-400 mb-3">
+                    <i class="fas fa-calendar-alt mr-1"></i> ${exp.start_date} - ${exp.end_date}
+                    ${exp.location ? `<span class="ml-4"><i class="fas fa-map-marker-alt mr-1"></i> ${exp.location}</span>` : ''}
+                </div>
+                ${exp.description ? `<p class="text-gray-300">${exp.description}</p>` : ''}
+            </div>
+        </div>
+    `).join('');
+}
+
 // Load Articles
 async function loadArticles() {
     try {
         const res = await fetch(`${API_BASE_URL}/articles?per_page=6`);
-        const data = await res.json();
-        
-        const container = document.getElementById('blog-list');
-        if (data.articles.length === 0) {
-            container.innerHTML = '<p class="col-span-full text-center text-gray-400">No articles yet</p>';
-            return;
-        }
-        
-        container.innerHTML = data.articles.map(article => `
-            <article class="bg-gray-900 rounded-2xl overflow-hidden hover:transform hover:scale-105 transition duration-300 shadow-xl">
-                ${article.cover_image ? `
-                    <img src="${article.cover_image}" alt="${article.title}" class="w-full h-48 object-cover">
-                ` : `
-                    <div class="w-full h-48 bg-gradient-to-br from-purple-600 to-pink-600 flex items-center justify-center">
-                        <i class="fas fa-newspaper text-6xl text-white/50"></i>
-                    </div>
-                `}
-                <div class="p-6">
-                    <div class="text-sm text-gray-400 mb-2">
-                        <i class="fas fa-calendar-alt mr-1"></i> ${new Date(article.created_at).toLocaleDateString()}
-                        <span class="ml-4"><i class="fas fa-eye mr-1"></i> ${article.views} views</span>
-                    </div>
-                    <h3 class="text-xl font-bold mb-3 hover:text-purple-400 transition">${article.title}</h3>
-                    <p class="text-gray-400 text-sm mb-4 line-clamp-3">${article.excerpt || article.content.substring(0, 150)}...</p>
-                    
-                    ${article.tags.length > 0 ? `
-                        <div class="flex flex-wrap gap-2 mb-4">
-                            ${article.tags.slice(0, 3).map(tag => `
-                                <span class="px-2 py-1 bg-gray-800 rounded text-xs">#${tag}</span>
-                            `).join('')}
-                        </div>
-                    ` : ''}
-                    
-                    <a href="#" class="text-purple-400 font-semibold hover:text-purple-300 transition">
-                        Read More <i class="fas fa-arrow-right ml-1"></i>
-                    </a>
-                </div>
-            </article>
-        `).join('');
+        renderArticles(await res.json());
     } catch (error) {
         console.error('Error loading articles:', error);
     }
 }
 
+// Render Articles
+function renderArticles(data) {
+    const container = document.getElementById('blog-list');
+    if (data.articles.length === 0) {
+        container.innerHTML = '<p class="col-span-full text-center text-gray-400">No articles yet</p>';
+        return;
+    }
+    
+    container.innerHTML = data.articles.map(article => `
+        <article class="bg-gray-900 rounded-2xl overflow-hidden hover:transform hover:scale-105 transition duration-300 shadow-xl">
+            ${article.cover_image ? `
+                ${cardImage(article.cover_image, article.srcset, article.placeholder, article.title, 'w-full h-48 object-cover')}
+            ` : `
+                <div class="w-full h-48 bg-gradient-to-br from-purple-600 to-pink-600 flex items-center justify-center">
+                    <i class="fas fa-newspaper text-6xl text-white/50"></i>
+                </div>
+            `}
+            <div class="p-6">
+                <div class="text-sm text-gray-400 mb-2">
+                    <i class="fas fa-calendar-alt mr-1"></i> ${new Date(article.created_at).toLocaleDateString()}
+                    <span class="ml-4"><i class="fas fa-eye mr-1"></i> ${article.views} views</span>
+                </div>
+                <h3 class="text-xl font-bold mb-3 hover:text-purple-400 transition">${article.title}</h3>
+                <p class="text-gray-400 text-sm mb-4 line-clamp-3">${article.excerpt || article.preview}...</p>
+    
+                ${article.tags.length > 0 ? `
+                    <div class="flex flex-wrap gap-2 mb-4">
+                        ${article.tags.slice(0, 3).map(tag => `
+                            <span class="px-2 py-1 bg-gray-800 rounded text-xs">#${tag}</span>
+                        `).join('')}
+                    </div>
+                ` : ''}
+    
+                <a href="#" class="text-purple-400 font-semibold hover:text-purple-300 transition">
+                    Read More <i class="fas fa-arrow-right ml-1"></i>
+                </a>
+            </div>
+        </article>
+    `).join('');
+}
+
 // Handle Contact Form Submit
 async function handleContactSubmit(e) {
     e.preventDefault();
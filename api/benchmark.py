@@ -0,0 +1,580 @@
+# Micro-benchmarks for the JSON data store (db.py).
+#
+# Each run works on a throwaway data file (JSON_DB_FILE), never on the
+# data.json that ships with the Vercel deployment.
+#
+#   python benchmark.py lookups --rows 10000
+#   python benchmark.py writes --rows 10000 --threads 8
+#   python benchmark.py recovery
+#   python benchmark.py queries --rows 10000
+#   python benchmark.py stress --writers 4 --readers 4
+#   python benchmark.py coldstart --sizes 1000,10000,100000
+#   python benchmark.py checks
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def load_db_module(**env):
+    """Import db.py against a fresh data file and return the module"""
+    workdir = tempfile.mkdtemp(prefix='jsondb_bench_')
+    os.environ['JSON_DB_FILE'] = os.path.join(workdir, 'data.json')
+    for key, value in env.items():
+        os.environ[key] = str(value)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import db
+    return db
+
+
+def make_data(rows):
+    now = '2025-01-01T00:00:00'
+    start = datetime(2024, 1, 1)
+
+    def created(i):
+        return (start + timedelta(minutes=i * 7 % (rows * 5))).isoformat()
+
+    return {
+        'users': [
+            {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com',
+             'password_hash': 'x' * 60, 'is_admin': i == 1}
+            for i in range(1, rows + 1)
+        ],
+        'projects': [
+            {'id': i, 'title': f'Project {i}', 'description': 'Benchmark project',
+             'long_description': 'x' * 500, 'image_url': '/uploads/x.png',
+             'demo_url': None, 'github_url': None, 'category_id': i % 7 + 1,
+             'tags': 'web,flask,bench', 'views': i % 97, 'likes': i % 31,
+             'featured': i % 10 == 0, 'created_at': created(i), 'updated_at': now}
+            for i in range(1, rows + 1)
+        ],
+        'skills': [
+            {'id': i, 'name': f'Skill {i}', 'level': i % 100, 'category': 'Backend'}
+            for i in range(1, rows + 1)
+        ],
+        'experiences': [
+            {'id': i, 'title': 'Developer', 'company': f'Company {i}', 'description': 'Work',
+             'start_date': '2020-01-01', 'end_date': None, 'is_current': False}
+            for i in range(1, rows + 1)
+        ],
+        'articles': [
+            {'id': i, 'title': f'Article {i}', 'content': 'y' * 1000,
+             'published': i % 3 != 0, 'created_at': created(i)}
+            for i in range(1, rows + 1)
+        ]
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed(fn, args_list):
+    samples = []
+    start = time.perf_counter()
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples, time.perf_counter() - start
+
+
+def report(label, samples, elapsed):
+    print(f"{label:<28} p50={percentile(samples, 50):8.4f}ms "
+          f"p99={percentile(samples, 99):8.4f}ms  {len(samples) / elapsed:10.0f} q/s")
+
+
+def log_size(db):
+    path = db.log_file()
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def bench_lookups(args):
+    db = load_db_module()
+    db.save_db(make_data(args.rows))
+
+    # The store before the cache: json.load on every call, then a scan
+    def legacy_user_by_username(username):
+        with open(db.DATABASE_FILE) as f:
+            data = json.load(f)
+        for user in data['users']:
+            if user['username'] == username:
+                return user
+        return None
+
+    def legacy_user_by_id(user_id):
+        with open(db.DATABASE_FILE) as f:
+            data = json.load(f)
+        for user in data['users']:
+            if user['id'] == user_id:
+                return user
+        return None
+
+    step = max(1, args.rows // args.requests)
+    ids = [(i,) for i in range(args.rows, 0, -step)][:args.requests]
+    names = [(f'user{i}',) for (i,) in ids]
+    print(f"{args.rows} rows per collection, {len(ids)} queries each")
+
+    legacy_requests = ids[:args.legacy_requests]
+    legacy_names = names[:args.legacy_requests]
+    report('legacy username', *timed(legacy_user_by_username, legacy_names))
+    report('legacy id', *timed(legacy_user_by_id, legacy_requests))
+
+    assert db.lookup('users', 'username', names[0][0])['id'] == ids[0][0]
+    report('cached username', *timed(lambda n: db.lookup('users', 'username', n), names))
+    report('cached id', *timed(lambda i: db.lookup('users', 'id', i), ids))
+
+    # A write from elsewhere: the next read reloads once, then hits again
+    data = make_data(args.rows)
+    data['users'][0]['username'] = 'renamed'
+    with open(db.DATABASE_FILE, 'w') as f:
+        json.dump(data, f)
+    t0 = time.perf_counter()
+    assert db.lookup('users', 'username', 'renamed') is not None
+    print(f"{'reload after external write':<28} {(time.perf_counter() - t0) * 1000:8.2f}ms")
+
+
+def bench_writes(args):
+    db = load_db_module()
+    db.save_db(make_data(args.rows))
+    print(f"{args.rows} rows per collection, {args.threads} threads x {args.writes} writes")
+
+    # The store before the log: every write rewrote the whole file
+    data = make_data(args.rows)
+    lock = threading.Lock()
+
+    def legacy_write(n):
+        with lock:
+            data['projects'][n % args.rows]['views'] += 1
+            with open(db.DATABASE_FILE + '.legacy', 'w') as f:
+                json.dump(data, f, indent=2)
+                size = f.tell()
+        return size
+
+    def log_write(n):
+        before = log_size(db)
+        row = db.lookup('projects', 'id', n % args.rows + 1)
+        db.update('projects', row['id'], {'views': row['views'] + 1})
+        return max(0, log_size(db) - before)
+
+    def run(label, write, count):
+        written = []
+
+        def worker(t):
+            for i in range(count):
+                written.append(write(t * count + i))
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        total = len(written)
+        print(f"{label:<20} {total / elapsed:8.0f} writes/s  {sum(written) / total / 1024:9.1f}KiB written/write")
+        return total
+
+    run('legacy rewrite', legacy_write, args.legacy_writes)
+    fsyncs = db._log.fsyncs
+    total = run('log + group commit', log_write, args.writes)
+    fsyncs = db._log.fsyncs - fsyncs
+    print(f"{'':<20} {fsyncs} fsyncs for {total} writes ({total / max(fsyncs, 1):.1f} per fsync), "
+          f"{db._log.compactions} compactions")
+
+
+def bench_queries(args):
+    db = load_db_module()
+    db.save_db(make_data(args.rows))
+    data = db.load_db()
+    print(f"{args.rows} rows per collection, {args.requests} runs each")
+    middle = make_data(args.rows)['projects'][args.rows // 2]['created_at']
+
+    def newest(rows):
+        return sorted(rows, key=lambda row: row['created_at'], reverse=True)
+
+    # Each case: the scan a caller wrote before, and the same result from Query
+    cases = [
+        ('category page',
+         lambda: newest(p for p in data['projects'] if p['category_id'] == 3)[18:27],
+         lambda: db.Query('projects').where(category_id=3).order_by('created_at', desc=True)
+                                      .offset(18).limit(9).all()),
+        ('newest 9',
+         lambda: newest(data['projects'])[:9],
+         lambda: db.Query('projects').order_by('created_at', desc=True).limit(9).all()),
+        ('created_at range count',
+         lambda: sum(1 for p in data['projects'] if p['created_at'] >= middle),
+         lambda: db.Query('projects').filter('created_at', '>=', middle).count()),
+        ('published count',
+         lambda: sum(1 for a in data['articles'] if a.get('published')),
+         lambda: db.Query('articles').where(published=True).count()),
+        ('category + featured',
+         lambda: [p for p in data['projects'] if p['category_id'] == 5 and p['featured']],
+         lambda: db.Query('projects').where(category_id=5, featured=True).all()),
+    ]
+    for label, scan, query in cases:
+        expected, got = scan(), query()
+        if isinstance(expected, list):
+            expected, got = [row['id'] for row in expected], [row['id'] for row in got]
+        assert expected == got, label
+        report(f'{label} scan', *timed(scan, [()] * args.requests))
+        report(f'{label} index', *timed(query, [()] * args.requests))
+
+
+RECOVERY_CHILD = """
+import os, sys
+sys.path.insert(0, {api!r})
+import db
+for i in range({count}):
+    db.insert('projects', {{'title': 'crash %d' % i}})
+# Die in the middle of the next append, before its newline reaches disk
+with open(db.log_file(), 'ab') as f:
+    f.write(b'0000abcd {{"op":"insert","c":"projects"')
+os._exit(1)
+"""
+
+
+def bench_recovery(args):
+    db = load_db_module()
+    db.save_db(make_data(args.rows))
+    api = os.path.dirname(os.path.abspath(__file__))
+    child = subprocess.run([sys.executable, '-c', RECOVERY_CHILD.format(api=api, count=args.writes)])
+    assert child.returncode == 1
+
+    t0 = time.perf_counter()
+    data = db.load_db()
+    elapsed = (time.perf_counter() - t0) * 1000
+    titles = [row['title'] for row in data['projects'][args.rows:]]
+    assert titles == [f'crash {i}' for i in range(args.writes)], titles[-3:]
+    db.insert('projects', {'title': 'after recovery'})
+    assert log_size(db) == db._cache.log_offset, 'torn tail kept'
+    print(f"recovered {len(titles)} logged writes over {args.rows} rows in {elapsed:.1f}ms, torn record dropped")
+
+    old_log = db.log_file()
+    db.compact()
+    assert not os.path.exists(old_log) and log_size(db) == 0
+    db._cache.data = None
+    assert len(db.load_db()['projects']) == args.rows + args.writes + 1
+    print(f"compacted into {os.path.getsize(db.SNAPSHOT_FILE) / 1024:.0f}KiB snapshot, reload matches")
+
+
+def stress_writer(db, args, worker, results):
+    # Optimistic increments: read the row and its _rev, write only if
+    # nobody else has changed it since, otherwise read again
+    conflicts = 0
+    for i in range(args.writes):
+        row_id = (worker + i) % args.hot + 1
+        while True:
+            row = db.lookup('projects', 'id', row_id)
+            try:
+                db.update('projects', row_id, {'views': row['views'] + 1}, expect=row['_rev'])
+                break
+            except db.ConflictError:
+                conflicts += 1
+    results.put(('writer', args.writes, conflicts))
+
+
+def stress_reader(db, args, stop, results):
+    reads = 0
+    start = time.perf_counter()
+    while not stop.is_set():
+        db.lookup('projects', 'id', reads % args.rows + 1)
+        db.Query('projects').where(category_id=reads % 7 + 1).order_by('created_at', desc=True).limit(9).all()
+        reads += 2
+    results.put(('reader', reads, time.perf_counter() - start))
+
+
+def stress_legacy_writer(path, args, worker, results):
+    # The store before the log: load, change, rewrite, with no lock
+    for i in range(args.legacy_writes):
+        row_id = (worker + i) % args.hot + 1
+        with open(path) as f:
+            data = json.load(f)
+        data['projects'][row_id - 1]['views'] += 1
+        temp = f'{path}.{os.getpid()}'
+        with open(temp, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp, path)
+    results.put(('writer', args.legacy_writes, 0))
+
+
+def run_processes(context, targets):
+    processes = [context.Process(target=target, args=target_args) for target, target_args in targets]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    return processes, start
+
+
+def bench_stress(args):
+    db = load_db_module()
+    data = make_data(args.rows)
+    for row in data['projects']:
+        row['views'] = 0
+    db.save_db(data)
+    expected = args.writers * args.writes
+    print(f"{args.rows} rows, {args.writers} writer processes x {args.writes} increments "
+          f"on {args.hot} rows, {args.readers} reader processes, {os.cpu_count()} CPUs")
+    # fork: the children share this module's store configuration
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+
+    def views(rows):
+        return sum(row['views'] for row in rows[:args.hot])
+
+    if args.legacy:
+        path = db.DATABASE_FILE + '.legacy'
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        processes, start = run_processes(context, [
+            (stress_legacy_writer, (path, args, w, results)) for w in range(args.writers)])
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        for _ in processes:
+            results.get()
+        legacy_expected = args.writers * args.legacy_writes
+        with open(path) as f:
+            total = views(json.load(f)['projects'])
+        print(f"{'legacy rewrite':<20} {legacy_expected / elapsed:8.0f} writes/s  "
+              f"{legacy_expected - total} of {legacy_expected} increments lost")
+
+    stop = context.Event()
+    readers, _ = run_processes(context, [
+        (stress_reader, (db, args, stop, results)) for _ in range(args.readers)])
+    time.sleep(0.2)
+    writers, start = run_processes(context, [
+        (stress_writer, (db, args, w, results)) for w in range(args.writers)])
+    for process in writers:
+        process.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for process in readers:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in writers + readers)
+    conflicts, reads, read_rate = 0, 0, 0.0
+    for _ in range(args.writers + args.readers):
+        kind, count, extra = results.get()
+        if kind == 'writer':
+            conflicts += extra
+        else:
+            reads += count
+            read_rate += count / extra
+
+    db._cache.data = None
+    total = views(db.load_db()['projects'])
+    assert total == expected, f'{expected - total} increments lost'
+    print(f"{'log + flock':<20} {expected / elapsed:8.0f} writes/s  0 of {expected} increments lost, "
+          f"{conflicts} conflicts retried")
+    print(f"{'':<20} {read_rate:8.0f} reads/s across {args.readers} readers while writing ({reads} reads)")
+    print(f"{'':<20} snapshot at seq {db.load_db()[db.SEQ_KEY]}, log {os.path.basename(db.log_file())} "
+          f"{log_size(db) / 1024:.0f}KiB")
+
+
+COLDSTART_CHILD = """
+import json, os, sys, time
+sys.path.insert(0, {api!r})
+t0 = time.perf_counter()
+import db
+user = db.lookup('users', 'username', 'user{rows}')
+t1 = time.perf_counter()
+project = db.lookup('projects', 'id', {rows} // 2)
+t2 = time.perf_counter()
+
+def memory(field):
+    # kB; VmHWM (peak) starts again at exec, unlike ru_maxrss
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ':'))
+
+rss = memory('VmRSS')
+count = db.Query('projects').where(category_id=3).count()
+t3 = time.perf_counter()
+assert user['id'] == {rows} and project['id'] == {rows} // 2 and count
+print(json.dumps({{'first': t1 - t0, 'second': t2 - t1, 'query': t3 - t2, 'rss': rss, 'peak': memory('VmHWM')}}))
+"""
+
+
+def bench_coldstart(args):
+    db = load_db_module()
+    import snapshot
+    api = os.path.dirname(os.path.abspath(__file__))
+    workdir = os.path.dirname(db.DATABASE_FILE)
+    print(f"{'rows':>7} {'format':<7} {'file':>9} {'import+lookup':>14} {'next lookup':>12} "
+          f"{'RSS after':>10} {'first query':>12} {'peak RSS':>10}")
+    for rows in [int(n) for n in args.sizes.split(',')]:
+        path = os.path.join(workdir, f'cold{rows}.json')
+        data = make_data(rows)
+        data[db.SEQ_KEY] = 0
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        del data
+        snapshot.to_binary(path, path[:-len('.json')] + '.snap', db.UNIQUE_INDEXES)
+
+        for fmt in ('json', 'binary'):
+            env = dict(os.environ, JSON_DB_FILE=path, JSON_DB_FORMAT=fmt)
+            runs = []
+            for _ in range(args.runs):
+                child = subprocess.run([sys.executable, '-c', COLDSTART_CHILD.format(api=api, rows=rows)],
+                                       env=env, capture_output=True, text=True, check=True)
+                runs.append(json.loads(child.stdout))
+            best = min(runs, key=lambda run: run['first'])
+            size = os.path.getsize(path if fmt == 'json' else path[:-len('.json')] + '.snap')
+            print(f"{rows:>7} {fmt:<7} {size / 1024 / 1024:7.1f}MB {best['first'] * 1000:12.1f}ms "
+                  f"{best['second'] * 1000:10.3f}ms {best['rss'] / 1024:8.1f}MB "
+                  f"{best['query'] * 1000:10.1f}ms {best['peak'] / 1024:8.1f}MB")
+
+
+READ_PROJECTS = """
+import sys
+sys.path.insert(0, {api!r})
+import db
+print(','.join(row['title'] for row in db.load_db()['projects']))
+"""
+
+
+def check_failed_batch(db):
+    # An insert whose index key cannot be compared with the others, in one
+    # group commit with good writes: only it fails, with a ValueError like a
+    # mixed-type query, the others commit, and a fresh process reads
+    # exactly the committed ones
+    outcomes = {}
+
+    def insert(title, category_id):
+        try:
+            db.insert('projects', {'title': title, 'category_id': category_id})
+            outcomes[title] = None
+        except Exception as e:
+            outcomes[title] = e
+
+    writes = [('good 1', 2), ('bad', '2'), ('good 2', 3), ('good 3', 4)]
+    fsyncs, db.COMMIT_DELAY = db._log.fsyncs, 0.2
+    try:
+        threads = [threading.Thread(target=insert, args=write) for write in writes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        db.COMMIT_DELAY = 0
+    assert db._log.fsyncs == fsyncs + 1, 'writes were not committed as one batch'
+    assert isinstance(outcomes.pop('bad'), ValueError)
+    assert all(error is None for error in outcomes.values()), outcomes
+    titles = [row['title'] for row in db.Query('projects').all()]
+    assert 'bad' not in titles and all(title in titles for title in outcomes)
+    db.insert('projects', {'title': 'after bad', 'category_id': 2})
+    api = os.path.dirname(os.path.abspath(__file__))
+    child = subprocess.run([sys.executable, '-c', READ_PROJECTS.format(api=api)],
+                           capture_output=True, text=True, check=True)
+    titles = child.stdout.strip().split(',')
+    assert 'bad' not in titles and titles[-1] == 'after bad', child.stdout
+    assert all(title in titles for title in outcomes), child.stdout
+
+
+def check_unique_bulk_update(db):
+    for i in range(3):
+        db.insert('users', {'username': f'bulk{i}', 'is_admin': False})
+    try:
+        db.Query('users').filter('username', '>=', 'bulk').update(username='dup')
+        raise AssertionError('duplicate username set on several rows')
+    except ValueError:
+        pass
+    assert db.lookup('users', 'username', 'dup') is None
+    assert db.Query('users').where(username='bulk1').update(username='dup') == 1
+    assert db.lookup('users', 'username', 'dup')['id'] == db.lookup('users', 'username', 'bulk0')['id'] + 1
+
+
+def check_mixed_type_filters(db):
+    # Operands that do not compare with the stored values are a ValueError,
+    # like an unknown operator, never an uncaught TypeError
+    queries = [
+        lambda: db.Query('projects').filter('created_at', '>=', 5).count(),
+        lambda: db.Query('projects').filter('created_at', '>=', 5).all(),
+        lambda: db.Query('projects').filter('title', '>=', 5).all(),
+        lambda: db.Query('projects').filter('title', '>=', 5).count(),
+        lambda: db.Query('projects').where(category_id='3').order_by('created_at').all(),
+        lambda: db.Query('projects').filter('views', '>', 1).filter('category_id', '<', 'x').all(),
+    ]
+    # None sorts last; only two different non-None types cannot be ordered
+    db.insert('projects', {'title': 'mixed', 'category_id': 1, 'demo_url': 7})
+    assert db.Query('projects').order_by('demo_url').first()['demo_url'] == 7
+    db.insert('projects', {'title': 'mixed', 'category_id': 1, 'demo_url': 'https://example.com'})
+    queries.append(lambda: db.Query('projects').order_by('demo_url').all())
+    for query in queries:
+        try:
+            query()
+            raise AssertionError('mixed-type query accepted')
+        except ValueError:
+            pass
+    assert db.Query('projects').filter('created_at', '>=', '2024-01-01').count() > 0
+
+
+def bench_checks(args):
+    db = load_db_module()
+    db.save_db(make_data(args.rows))
+    checks = [check_failed_batch, check_unique_bulk_update, check_mixed_type_filters]
+    for check in checks:
+        check(db)
+        print(f"{check.__name__:<28} ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON data store micro-benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    lookups = sub.add_parser('lookups', help='user lookups: load-and-scan vs cached hash index')
+    lookups.add_argument('--rows', type=int, default=10000)
+    lookups.add_argument('--requests', type=int, default=2000)
+    lookups.add_argument('--legacy-requests', type=int, default=50, help='the old path is slow')
+    lookups.set_defaults(func=bench_lookups)
+
+    writes = sub.add_parser('writes', help='concurrent updates: full rewrite vs log with group commit')
+    writes.add_argument('--rows', type=int, default=10000)
+    writes.add_argument('--threads', type=int, default=8)
+    writes.add_argument('--writes', type=int, default=250, help='per thread')
+    writes.add_argument('--legacy-writes', type=int, default=5, help='per thread, the old path is slow')
+    writes.set_defaults(func=bench_writes)
+
+    recovery = sub.add_parser('recovery', help='replay the log after a writer dies mid-append')
+    recovery.add_argument('--rows', type=int, default=10000)
+    recovery.add_argument('--writes', type=int, default=500)
+    recovery.set_defaults(func=bench_recovery)
+
+    queries = sub.add_parser('queries', help='filtered/sorted/counted reads: list scans vs Query indexes')
+    queries.add_argument('--rows', type=int, default=10000)
+    queries.add_argument('--requests', type=int, default=200)
+    queries.set_defaults(func=bench_queries)
+
+    stress = sub.add_parser('stress', help='writer and reader processes sharing one store')
+    stress.add_argument('--rows', type=int, default=10000)
+    stress.add_argument('--writers', type=int, default=4)
+    stress.add_argument('--readers', type=int, default=4)
+    stress.add_argument('--writes', type=int, default=500, help='increments per writer')
+    stress.add_argument('--hot', type=int, default=8, help='rows the writers contend for')
+    stress.add_argument('--legacy', action='store_true', help='also run the unlocked load-modify-rewrite')
+    stress.add_argument('--legacy-writes', type=int, default=10, help='per writer, the old path is slow')
+    stress.set_defaults(func=bench_stress)
+
+    coldstart = sub.add_parser('coldstart', help='new process to first lookup: JSON vs memory-mapped snapshot')
+    coldstart.add_argument('--sizes', default='1000,10000,100000', help='rows per collection')
+    coldstart.add_argument('--runs', type=int, default=3, help='best of, per size and format')
+    coldstart.set_defaults(func=bench_coldstart)
+
+    checks = sub.add_parser('checks', help='regression checks for failure cases of the store')
+    checks.add_argument('--rows', type=int, default=100)
+    checks.set_defaults(func=bench_checks)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
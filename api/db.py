@@ -1,9 +1,76 @@
+"""JSON data store for the serverless deployment.
+
+``data.json`` is a snapshot; every change after it is appended to a log as
+one checksummed JSON line (insert/update/delete of a row), so a write costs
+the size of the change. Writers that arrive while a log fsync is running
+are flushed together with the next one (group commit). When the log passes
+``JSON_DB_COMPACT_BYTES`` it is folded into a new snapshot (``compact``).
+After a crash, loading replays the log over the snapshot and drops a torn
+last record.
+
+Several processes (gunicorn workers, serverless instances on one volume)
+can share the files:
+
+- Writers take an exclusive ``fcntl.flock`` on ``data.json.lock`` for one
+  batch: catch up on the other processes' records, check and apply the
+  batch, append, fsync, release.
+- Readers never lock. Snapshots are only ever renamed into place, and each
+  one has its own log, ``data.json.<seq>.log`` (records after ``seq``).
+  Compaction starts a new log instead of truncating the old one, so a
+  reader always sees one snapshot plus a prefix of its log: a consistent
+  state, at worst slightly old.
+- Every row carries a revision ``_rev``. ``update``/``delete`` with
+  ``expect=`` raise ``ConflictError`` when another writer changed the row
+  after it was read (optimistic concurrency).
+
+With ``JSON_DB_FORMAT=binary`` the snapshot is ``data.snap`` instead, a
+memory-mapped file (snapshot.py) that is not parsed up front: ``lookup``
+reads single rows from it, and a collection is decoded only once a query
+or a write needs it. An existing data.json is converted on first start.
+
+Reads go through ``lookup`` (hash indexes on ``id`` and UNIQUE_INDEXES)
+and ``Query`` (filters, order_by, limit/offset and counts planned over the
+ordered INDEXES).
+"""
+import copy
 import json
+import operator
 import os
+import threading
+import time
+import zlib
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
 
+import snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, run a single process
+    fcntl = None
+
 # In-memory database using JSON
-DATABASE_FILE = os.path.join(os.path.dirname(__file__), 'data.json')
+DATABASE_FILE = os.environ.get('JSON_DB_FILE', os.path.join(os.path.dirname(__file__), 'data.json'))
+LOCK_FILE = DATABASE_FILE + '.lock'
+SNAPSHOT_FORMAT = os.environ.get('JSON_DB_FORMAT', 'json')  # json, or binary (snapshot.py)
+SNAPSHOT_FILE = DATABASE_FILE if SNAPSHOT_FORMAT == 'json' else os.path.splitext(DATABASE_FILE)[0] + '.snap'
+COMPACT_BYTES = int(os.environ.get('JSON_DB_COMPACT_BYTES', 1024 * 1024))  # log size that triggers compaction
+COMMIT_DELAY = float(os.environ.get('JSON_DB_COMMIT_DELAY', 0))  # seconds a flush waits for more writers
+SEQ_KEY = '_seq'  # last log record folded into the snapshot
+REV_KEY = '_rev'  # per-row revision, bumped by every update
+
+# Secondary hash indexes besides "id": collection -> unique fields
+UNIQUE_INDEXES = {
+    'users': ('username',)
+}
+
+# Ordered secondary indexes: collection -> fields. Each is a sorted list of
+# (value is None, value, id) keys, so equality and range filters, order_by
+# and counts on the field are bisects instead of scans (see Query)
+INDEXES = {
+    'projects': ('category_id', 'created_at'),
+    'articles': ('published',)
+}
 
 # Initialize database with default data
 DEFAULT_DATA = {
@@ -62,86 +129,767 @@ DEFAULT_DATA = {
     ]
 }
 
+def _sort_key(row, field):
+    value = row.get(field)
+    return (value is None, value, row['id'])
+
+class _Cache:
+    """data.json plus the log replayed over it, with hash and ordered indexes"""
+    
+    def __init__(self):
+        self.snapshot_stamp = None
+        self.log_path = None
+        self.log_offset = 0  # bytes of the log already applied
+        self.seq = 0  # last applied log sequence number
+        self.data = None
+        self.indexes = {}
+        self.ordered = {}
+        self.next_ids = {}
+        self.snapshot = None  # binary snapshot the unloaded collections are read from
+        self.unloaded = set()
+    
+    def fill(self, data, snapshot_stamp, mapped=None):
+        if self.snapshot is not None and self.snapshot is not mapped:
+            self.snapshot.close()
+        self.data, self.indexes, self.ordered, self.next_ids = data, {}, {}, {}
+        self.snapshot = mapped
+        self.unloaded = set(mapped.collections) if mapped is not None else set()
+        for name, rows in data.items():
+            if isinstance(rows, list):
+                self._fill_collection(name, rows)
+        self.snapshot_stamp = snapshot_stamp
+        self.seq = data.get(SEQ_KEY, 0)
+        self.log_path = _log_path(self.seq)
+        self.log_offset = 0
+    
+    def _fill_collection(self, name, rows):
+        for row in rows:
+            row.setdefault(REV_KEY, 1)  # rows written before revisions existed
+        self.indexes[(name, 'id')] = {row['id']: row for row in rows if 'id' in row}
+        self.next_ids[name] = max(self.indexes[(name, 'id')], default=0) + 1
+        for field in UNIQUE_INDEXES.get(name, ()):
+            self.indexes[(name, field)] = {row[field]: row for row in rows if field in row}
+        for field in INDEXES.get(name, ()):
+            self.ordered[(name, field)] = sorted(_sort_key(row, field) for row in rows)
+    
+    def load(self, name):
+        """Decode a collection of the binary snapshot the first time it is needed"""
+        if name in self.unloaded:
+            self.unloaded.discard(name)
+            rows = self.snapshot.rows(name)
+            self.data[name] = rows
+            self._fill_collection(name, rows)
+    
+    def load_all(self):
+        for name in list(self.unloaded):
+            self.load(name)
+    
+    def find(self, collection, field, value):
+        """Indexed row lookup that leaves an unloaded collection on disk"""
+        if collection in self.unloaded and self.snapshot.has_index(collection, field):
+            row = self.snapshot.find(collection, field, value)
+            if row is not None:
+                row.setdefault(REV_KEY, 1)
+            return row
+        self.load(collection)
+        return self.indexes.get((collection, field), {}).get(value)
+    
+    def _index(self, collection, row, add=True):
+        for field in ('id',) + UNIQUE_INDEXES.get(collection, ()):
+            if field in row:
+                index = self.indexes.setdefault((collection, field), {})
+                if add:
+                    index[row[field]] = row
+                else:
+                    index.pop(row[field], None)
+        for field in INDEXES.get(collection, ()):
+            keys = self.ordered.setdefault((collection, field), [])
+            key = _sort_key(row, field)
+            if add:
+                insort(keys, key)
+            else:
+                i = bisect_left(keys, key)
+                if i < len(keys) and keys[i] == key:
+                    del keys[i]
+    
+    def apply(self, record):
+        """Replay one log record onto the in-memory data"""
+        collection, op = record['c'], record['op']
+        self.load(collection)
+        rows = self.data.setdefault(collection, [])
+        current = self.indexes.get((collection, 'id'), {}).get(record.get('id'))
+        if op == 'insert':
+            row = record['row']
+            rows.append(row)
+            self._index(collection, row)
+            self.next_ids[collection] = max(self.next_ids.get(collection, 1), row['id'] + 1)
+        elif op == 'update' and current is not None:
+            self._index(collection, current, add=False)
+            current.update(record['row'])
+            current[REV_KEY] = current.get(REV_KEY, 1) + 1
+            self._index(collection, current)
+        elif op == 'delete' and current is not None:
+            self._index(collection, current, add=False)
+            rows.pop(next(i for i, row in enumerate(rows) if row is current))
+        self.seq = record['seq']
+
+class ConflictError(Exception):
+    """The row changed since the revision the caller expected"""
+
+class _Write:
+    """One queued write: ``prepare()`` returns ``(records, result)``"""
+    
+    def __init__(self, prepare):
+        self.prepare = prepare
+        self.result = None
+        self.error = RuntimeError('write was not applied')
+        self.done = False
+
+class _Log:
+    """Group commit: concurrent writers share one write() and one fsync()"""
+    
+    def __init__(self):
+        # A plain Lock: _flush releases it around the file work, which an
+        # RLock held by nested calls would not do
+        self.cond = threading.Condition(threading.Lock())
+        self.queue = []
+        self.flushing = False
+        self.fsyncs = 0
+        self.compactions = 0
+
+class _WriterLock:
+    """Exclusive flock on LOCK_FILE, shared by the threads of one process"""
+    
+    def __init__(self):
+        self.fd = None
+        self.pid = None
+    
+    def __enter__(self):
+        # flock belongs to the open file, which a forked worker inherits;
+        # each process opens its own so the lock excludes it from the others
+        if self.pid != os.getpid():
+            os.makedirs(os.path.dirname(LOCK_FILE) or '.', exist_ok=True)
+            self.fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+            self.pid = os.getpid()
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+    
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+_cache = _Cache()
+_log = _Log()
+_writer_lock = _WriterLock()
+
+def _log_path(seq):
+    """Log of the records after the snapshot that ends at ``seq``"""
+    return f'{DATABASE_FILE}.{seq}.log'
+
+def log_file():
+    """Path of the log currently being appended to"""
+    with _log.cond:
+        _refresh()
+        return _cache.log_path
+
+def _file_stamp(path=None, fd=None):
+    """(inode, mtime, size) of a file, or None if it does not exist"""
+    try:
+        st = os.fstat(fd) if fd is not None else os.stat(path or SNAPSHOT_FILE)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _encode(record):
+    body = json.dumps(record, separators=(',', ':'), default=str).encode()
+    return b'%08x %s\n' % (zlib.crc32(body), body)
+
+def _read_log(path, offset):
+    """``(records, end)`` from ``offset``: every complete record whose
+    checksum matches, stopping at a torn or corrupt tail. A log removed by
+    a compaction elsewhere reads as empty; the next refresh sees the new
+    snapshot."""
+    records = []
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n') or line[8:9] != b' ':
+                    break
+                body = line[9:-1]
+                try:
+                    if int(line[:8], 16) != zlib.crc32(body):
+                        break
+                    records.append(json.loads(body))
+                except ValueError:
+                    break
+                offset += len(line)
+    except FileNotFoundError:
+        pass
+    return records, offset
+
+def _catch_up():
+    """Apply new log records; False if they do not follow on from the cache"""
+    records, end = _read_log(_cache.log_path, _cache.log_offset)
+    for record in records:
+        if record['seq'] <= _cache.seq:
+            continue
+        if record['seq'] != _cache.seq + 1:
+            return False
+        _cache.apply(record)
+    _cache.log_offset = max(_cache.log_offset, end)
+    return True
+
+def _recover():
+    """Load the snapshot and replay its log over it"""
+    data = copy.deepcopy(DEFAULT_DATA)
+    mapped = None
+    stamp = None
+    path = SNAPSHOT_FILE
+    if not os.path.exists(path) and os.path.exists(DATABASE_FILE):
+        path = DATABASE_FILE  # binary format, data.json not converted yet
+    try:
+        with open(path, 'rb') as f:
+            if path == DATABASE_FILE:
+                data = json.load(f)
+            else:
+                mapped = snapshot.Snapshot(f)
+                data = dict(mapped.meta)
+            # Stamp the file that was opened, not whatever is at the path now
+            stamp = _file_stamp(fd=f.fileno()) if path == SNAPSHOT_FILE else None
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        # Snapshots are renamed into place whole, so this is damage from
+        # outside; keep the file for inspection instead of overwriting it
+        aside = f'{path}.corrupt-{int(time.time())}'
+        os.replace(path, aside)
+        print(f"JSON store snapshot unreadable ({e}), moved to {aside}")
+        stamp = None
+    _cache.fill(data, stamp, mapped)
+    # A torn last record is skipped here and cut off by the next append
+    _catch_up()
+
+def _refresh():
+    """Bring the cache up to date with the files (lock held)"""
+    if _cache.data is None or _file_stamp() != _cache.snapshot_stamp:
+        _recover()
+    else:
+        log_stamp = _file_stamp(_cache.log_path)
+        if log_stamp is not None and log_stamp[2] > _cache.log_offset and not _catch_up():
+            _recover()
+    return _cache.data
+
+def _get(collection, field, value):
+    _cache.load(collection)
+    return _cache.indexes.get((collection, field), {}).get(value)
+
 def load_db():
-    """Load database from JSON file"""
-    if os.path.exists(DATABASE_FILE):
+    """Load database from JSON file.
+    
+    The snapshot (data.json) is parsed once and kept in memory together
+    with the log records written after it. A later call only stats both
+    files: a new snapshot is loaded again, a longer log has its new records
+    replayed. The returned rows are shared by every caller, so change data
+    through ``insert``/``update``/``delete`` or ``save_db``.
+    """
+    with _log.cond:
+        _refresh()
+        _cache.load_all()
+        return _cache.data
+
+def lookup(collection, field, value):
+    """Row of ``collection`` whose indexed ``field`` equals ``value``, in O(1)"""
+    with _log.cond:
+        _refresh()
+        return _cache.find(collection, field, value)
+
+def _apply_batch(batch):
+    """Prepare, sequence and apply queued writes; their encoded records
+    (writer lock and cache lock held)"""
+    _refresh()
+    lines = []
+    for write in batch:
+        try:
+            records, write.result = write.prepare()
+        except Exception as e:
+            write.error = e
+            continue
+        start = len(lines)
+        try:
+            for record in records:
+                record['seq'] = _cache.seq + 1
+                lines.append(_encode(record))
+                _cache.apply(record)
+        except Exception as e:
+            # prepare() should have refused it. A half-applied write leaves
+            # the indexes inconsistent: rebuild the cache from the files plus
+            # the writes accepted so far, and fail this write only
+            del lines[start:]
+            _recover()
+            for line in lines:
+                _cache.apply(json.loads(line[9:-1]))
+            write.error = e
+            continue
+        write.error = None
+    return lines
+
+def _flush():
+    """Write the queue as one append and one fsync (cache lock held on entry)"""
+    _log.flushing = True
+    batch = []
+    try:
+        if COMMIT_DELAY:
+            # Let writers arriving right now join this batch
+            _log.cond.wait(COMMIT_DELAY)
+        batch, _log.queue = _log.queue, []
+        _log.cond.release()
         try:
-            with open(DATABASE_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return DEFAULT_DATA
-    return DEFAULT_DATA
+            with _writer_lock:
+                with _log.cond:
+                    lines = _apply_batch(batch)
+                    path, offset = _cache.log_path, _cache.log_offset
+                if not lines:
+                    return
+                try:
+                    with open(path, 'ab') as f:
+                        if f.tell() > offset:
+                            # A torn record from a writer that crashed mid-append
+                            f.truncate(offset)
+                        f.write(b''.join(lines))
+                        f.flush()
+                        os.fsync(f.fileno())
+                        end = f.tell()
+                except OSError as e:
+                    with _log.cond:
+                        # Memory is ahead of the disk; reload it from the files
+                        _cache.data = None
+                        for write in batch:
+                            write.error = e
+                    return
+                with _log.cond:
+                    _log.fsyncs += 1
+                    _cache.log_offset = max(_cache.log_offset, end)
+                    if end >= COMPACT_BYTES:
+                        _compact()
+        finally:
+            _log.cond.acquire()
+    finally:
+        for write in batch:
+            write.done = True
+        _log.flushing = False
+        _log.cond.notify_all()
+
+def _submit(prepare):
+    """Queue a write and return its result once it is durable.
+    
+    ``prepare`` runs in whichever thread flushes the batch, under the writer
+    lock and after catching up on every other process's records, so its
+    checks see exactly the state its records are applied to. Raising fails
+    this write only.
+    """
+    write = _Write(prepare)
+    with _log.cond:
+        _log.queue.append(write)
+        while not write.done:
+            if _log.flushing:
+                _log.cond.wait()
+            else:
+                _flush()
+    if write.error is not None:
+        raise write.error
+    return write.result
+
+def _check_values(collection, values):
+    """Refuse values the log cannot encode or the indexes cannot hold, so a
+    bad write fails in prepare() instead of while its batch is applied"""
+    try:
+        json.dumps(values, default=str)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'{collection} row cannot be stored: {e}') from None
+    row_id = values.get('id')
+    if row_id is not None and (not isinstance(row_id, int) or isinstance(row_id, bool)):
+        raise ValueError(f'{collection}.id must be an integer, not {row_id!r}')
+    for field in UNIQUE_INDEXES.get(collection, ()):
+        try:
+            hash(values.get(field))
+        except TypeError:
+            raise ValueError(f'{collection}.{field} {values[field]!r} cannot be indexed') from None
+    _cache.load(collection)
+    for field in INDEXES.get(collection, ()):
+        value = values.get(field)
+        if value is None:
+            continue
+        # The ordered index holds one comparable type (ints and floats mix);
+        # compare with its first value, or with itself when it has none
+        keys = _cache.ordered.get((collection, field))
+        other = keys[0][1] if keys and not keys[0][0] else value
+        try:
+            value < other
+        except TypeError:
+            raise ValueError(f'{collection}.{field} {value!r} does not compare with '
+                             f'the indexed values ({type(other).__name__})') from None
+
+def _check_unique(collection, values, row_id=None):
+    if row_id is not None and values.get('id', row_id) != row_id:
+        raise ValueError(f'{collection}.id cannot be changed')
+    if REV_KEY in values:
+        raise ValueError(f'{REV_KEY} is maintained by the store')
+    for field in ('id',) + UNIQUE_INDEXES.get(collection, ()):
+        if field in values:
+            other = _get(collection, field, values[field])
+            if other is not None and other['id'] != row_id:
+                raise ValueError(f'{collection}.{field} {values[field]!r} already exists')
+
+def _check_revision(row, expect):
+    if expect is not None and row[REV_KEY] != expect:
+        raise ConflictError(f"row {row['id']} is at revision {row[REV_KEY]}, expected {expect}")
+
+def insert(collection, row):
+    """Append a row; assigns ``id`` when missing. Returns the stored row"""
+    row = dict(row)
+    
+    def prepare():
+        _check_values(collection, row)
+        _check_unique(collection, row)
+        _cache.load(collection)
+        if row.get('id') is None:
+            row['id'] = _cache.next_ids.get(collection, 1)
+        row[REV_KEY] = 1
+        return [{'op': 'insert', 'c': collection, 'id': row['id'], 'row': row}], row
+    return _submit(prepare)
+
+def update(collection, row_id, changes, expect=None):
+    """Set ``changes`` on one row; returns it, or None if there is no such row.
+    
+    With ``expect`` (the ``_rev`` the caller read) the update is refused
+    with ConflictError if the row has changed since.
+    """
+    changes = dict(changes)
+    
+    def prepare():
+        current = _get(collection, 'id', row_id)
+        if current is None:
+            return [], None
+        _check_revision(current, expect)
+        _check_values(collection, changes)
+        _check_unique(collection, changes, row_id)
+        return [{'op': 'update', 'c': collection, 'id': row_id, 'row': changes}], current
+    return _submit(prepare)
+
+def delete(collection, row_id, expect=None):
+    """Remove one row; False if there was none"""
+    def prepare():
+        current = _get(collection, 'id', row_id)
+        if current is None:
+            return [], False
+        _check_revision(current, expect)
+        return [{'op': 'delete', 'c': collection, 'id': row_id}], True
+    return _submit(prepare)
+
+def _compact():
+    """Write the cache as a new snapshot with an empty log of its own
+    (writer lock and cache lock held)"""
+    directory = os.path.dirname(SNAPSHOT_FILE) or '.'
+    os.makedirs(directory, exist_ok=True)
+    temp = f'{SNAPSHOT_FILE}.{os.getpid()}.tmp'
+    _cache.load_all()
+    data = {**_cache.data, SEQ_KEY: _cache.seq}
+    with open(temp, 'w' if SNAPSHOT_FORMAT == 'json' else 'wb') as f:
+        if SNAPSHOT_FORMAT == 'json':
+            json.dump(data, f, indent=2)
+        else:
+            snapshot.dump(data, f, UNIQUE_INDEXES)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, SNAPSHOT_FILE)
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    old_log = _cache.log_path
+    _cache.data[SEQ_KEY] = _cache.seq
+    _cache.snapshot_stamp = _file_stamp()
+    _cache.log_path = _log_path(_cache.seq)
+    _cache.log_offset = 0
+    if old_log != _cache.log_path:
+        # Readers that still have it open finish reading it undisturbed
+        try:
+            os.remove(old_log)
+        except OSError:
+            pass
+    _log.compactions += 1
+
+def _exclusive(fn):
+    """Run ``fn`` with no flush in this process and the writer lock held"""
+    with _log.cond:
+        while _log.flushing:
+            _log.cond.wait()
+        _log.flushing = True
+    try:
+        with _writer_lock:
+            with _log.cond:
+                _refresh()
+                return fn()
+    finally:
+        with _log.cond:
+            _log.flushing = False
+            _log.cond.notify_all()
+
+def compact():
+    """Fold the log into a new snapshot.
+    
+    The snapshot is written to a temporary file, fsynced and renamed over
+    data.json, so a crash leaves either the old or the new one. It records
+    the last sequence number it contains and gets a new, empty log; the
+    old log is removed once nothing needs it.
+    """
+    _exclusive(_compact)
+
+def _replace(data):
+    """Make ``data`` the snapshot, dropping the current log (locks held)"""
+    seq = _cache.seq
+    _cache.fill(data, _cache.snapshot_stamp)
+    _cache.seq = max(seq, _cache.seq) + 1
+    _cache.log_path = _log_path(seq)  # the log being replaced, removed by _compact
+    _compact()
 
 def save_db(data):
-    """Save database to JSON file"""
-    os.makedirs(os.path.dirname(DATABASE_FILE) or '.', exist_ok=True)
-    with open(DATABASE_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    """Replace the whole database (a new snapshot)"""
+    _exclusive(lambda: _replace(data))
+
+def _adopt_unversioned_log():
+    """Take over ``data.json.log`` from before logs were versioned (locks held)"""
+    old_log = DATABASE_FILE + '.log'
+    if os.path.exists(old_log):
+        os.replace(old_log, _log_path(_cache.data.get(SEQ_KEY, 0)))
+        _recover()
+        _compact()
 
 # Initialize database
-if not os.path.exists(DATABASE_FILE):
-    save_db(DEFAULT_DATA)
-
-def query_one(sql, params=None):
-    """Simulate database query - return one result"""
-    db = load_db()
-    
-    # Parse simple SQL queries
-    if 'FROM users WHERE' in sql and 'username' in sql:
-        username = params[0] if params else None
-        for user in db['users']:
-            if user['username'] == username:
-                return user
-        return None
+if not os.path.exists(SNAPSHOT_FILE):
+    if os.path.exists(DATABASE_FILE):
+        # Switched to the binary format: write data.json as the first data.snap
+        _exclusive(lambda: os.path.exists(SNAPSHOT_FILE) or _compact())
+    else:
+        # Another process may be creating it right now
+        _exclusive(lambda: os.path.exists(SNAPSHOT_FILE) or _replace(copy.deepcopy(DEFAULT_DATA)))
+if os.path.exists(DATABASE_FILE + '.log'):
+    _exclusive(_adopt_unversioned_log)
+
+OPERATORS = {
+    '==': operator.eq,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le
+}
+
+def _matches(row, filters):
+    for field, op, value in filters:
+        current = row.get(field)
+        if op == '==':
+            if current != value:
+                return False
+        elif current is None or not OPERATORS[op](current, value):
+            return False
+    return True
+
+def _bounds(keys, filters):
+    """Slice of an ordered index that satisfies ``filters`` on its field"""
+    lo, hi = 0, len(keys)
+    for _, op, value in filters:
+        # Keys are (value is None, value, id); the 2-tuple sorts before
+        # every id of that value and the 3-tuple with inf after them
+        below, above = (value is None, value), (value is None, value, float('inf'))
+        if op in ('==', '>='):
+            lo = max(lo, bisect_left(keys, below, lo, hi))
+        if op == '>':
+            lo = max(lo, bisect_right(keys, above, lo, hi))
+        if op in ('==', '<='):
+            hi = min(hi, bisect_right(keys, above, lo, hi))
+        if op == '<':
+            hi = min(hi, bisect_left(keys, below, lo, hi))
+        if op in ('>', '>=', '<', '<=') and value is not None:
+            # Range filters never match missing values
+            hi = min(hi, bisect_left(keys, (True,), lo, hi))
+    return lo, max(lo, hi)
+
+class Query:
+    """Filters, ordering and paging over one collection.
     
-    elif 'FROM users WHERE id' in sql:
-        user_id = params[0] if params else None
-        for user in db['users']:
-            if user['id'] == user_id:
-                return user
-        return None
+        Query('projects').where(category_id=2).order_by('created_at', desc=True).limit(9).all()
+        Query('articles').where(published=True).count()
+        Query('projects').filter('created_at', '>=', '2025-01-01').page(2, 10)
+    
+    Equality on ``id`` or a unique field is a hash lookup. Otherwise the
+    declared INDEXES field whose bisected slice is smallest supplies the
+    candidates, and the remaining filters are checked on those rows only.
+    An indexed ``order_by`` with no usable filter walks the index in order
+    and stops after ``offset + limit`` matches. Counts answered by one
+    index are a subtraction.
+    """
+    
+    def __init__(self, collection):
+        self.collection = collection
+        self.filters = []
+        self.order = None
+        self.descending = False
+        self._limit = None
+        self._offset = 0
+    
+    def where(self, **equals):
+        for field, value in equals.items():
+            self.filters.append((field, '==', value))
+        return self
+    
+    def filter(self, field, op, value):
+        if op not in OPERATORS:
+            raise ValueError(f'Unsupported operator {op!r}')
+        self.filters.append((field, op, value))
+        return self
+    
+    def order_by(self, field, desc=False):
+        self.order, self.descending = field, desc
+        return self
+    
+    def limit(self, n):
+        self._limit = n
+        return self
+    
+    def offset(self, n):
+        self._offset = n
+        return self
+    
+    def _plan(self):
+        """``(rows, in_order, residual)``: candidate rows, whether they already
+        follow ``order_by``, and the filters still to check on them"""
+        collection = self.collection
+        _cache.load(collection)
+        rows_by_id = _cache.indexes.get((collection, 'id'), {})
+        for field, op, value in self.filters:
+            if op == '==' and (field == 'id' or field in UNIQUE_INDEXES.get(collection, ())):
+                row = _get(collection, field, value)
+                return ([row] if row is not None else []), True, self.filters
+        
+        indexed = INDEXES.get(collection, ())
+        total = len(_cache.data.get(collection, []))
+        best = None
+        for field in indexed:
+            on_field = [f for f in self.filters if f[0] == field]
+            if on_field:
+                lo, hi = _bounds(_cache.ordered[(collection, field)], on_field)
+                if best is None or hi - lo < best[2] - best[1]:
+                    best = (field, lo, hi)
+        
+        walk_order = self.order in indexed
+        if best is not None and walk_order and best[0] != self.order and self._limit is not None:
+            # Filter slice vs walking the order index: sorting the slice
+            # costs its size, the walk about (offset + limit) / selectivity
+            size = best[2] - best[1]
+            walk_order = size and (self._offset + self._limit) * total / size < size
+        if best is not None and not (walk_order and best[0] != self.order):
+            field, lo, hi = best
+            keys = _cache.ordered[(collection, field)][lo:hi]
+            in_order = self.order in (None, field)
+            if self.order == field and self.descending:
+                keys.reverse()
+            residual = [f for f in self.filters if f[0] != field]
+            return [rows_by_id[key[2]] for key in keys], in_order, residual
+        
+        if walk_order:
+            keys = _cache.ordered[(collection, self.order)]
+            ids = (key[2] for key in (reversed(keys) if self.descending else keys))
+            return (rows_by_id[i] for i in ids), True, self.filters
+        return _cache.data.get(collection, []), self.order is None, self.filters
+    
+    def _type_error(self, e):
+        # A filter or order_by value that does not compare with the stored
+        # ones (5 against an ISO date string, a str against ints, None)
+        return ValueError(f'Cannot compare values in a {self.collection} query: {e}')
+    
+    def _run(self):
+        try:
+            return self._collect()
+        except TypeError as e:
+            raise self._type_error(e) from None
+    
+    def _collect(self):
+        rows, in_order, residual = self._plan()
+        if len(residual) == 1 and residual[0][1] == '==':
+            name, _, value = residual[0]
+            rows = (row for row in rows if row.get(name) == value)
+        elif residual:
+            rows = (row for row in rows if _matches(row, residual))
+        if not in_order:
+            order = self.order
+            rows = sorted(rows, key=lambda row: (row.get(order) is None, row.get(order)),
+                          reverse=self.descending)
+        end = None if self._limit is None else self._offset + self._limit
+        result = []
+        for i, row in enumerate(rows):
+            if end is not None and i >= end:
+                break
+            if i >= self._offset:
+                result.append(row)
+        return result
+    
+    def all(self):
+        with _log.cond:
+            _refresh()
+            return self._run()
+    
+    def first(self):
+        self._limit = 1
+        rows = self.all()
+        return rows[0] if rows else None
+    
+    def count(self):
+        with _log.cond:
+            _refresh()
+            try:
+                return self._count()
+            except TypeError as e:
+                raise self._type_error(e) from None
+    
+    def _count(self):
+        _cache.load(self.collection)
+        fields = {f[0] for f in self.filters}
+        if not self.filters:
+            return len(_cache.data.get(self.collection, []))
+        if len(fields) == 1 and next(iter(fields)) in INDEXES.get(self.collection, ()):
+            lo, hi = _bounds(_cache.ordered[(self.collection, fields.pop())], self.filters)
+            return hi - lo
+        rows, _, residual = self._plan()
+        return sum(1 for row in rows if _matches(row, residual))
+    
+    def page(self, page, per_page):
+        """``(rows, total)`` for 1-based ``page``"""
+        total = self.count()
+        rows = self.offset((page - 1) * per_page).limit(per_page).all()
+        return rows, total
+    
+    def update(self, **changes):
+        """Set ``changes`` on every matching row, in one commit; returns the count"""
+        def prepare():
+            ids = [row['id'] for row in self._run()]
+            unique = [f for f in ('id',) + UNIQUE_INDEXES.get(self.collection, ()) if f in changes]
+            if unique and len(ids) > 1:
+                raise ValueError(f'{self.collection}.{unique[0]} cannot be set on {len(ids)} rows at once')
+            _check_values(self.collection, changes)
+            for row_id in ids:
+                _check_unique(self.collection, changes, row_id)
+            records = [{'op': 'update', 'c': self.collection, 'id': row_id, 'row': dict(changes)}
+                       for row_id in ids]
+            return records, len(ids)
+        return _submit(prepare)
     
-    elif 'FROM projects' in sql:
-        if db['projects']:
-            return {'count': len(db['projects'])}
-        return {'count': 0}
-    
-    elif 'FROM skills' in sql:
-        if db['skills']:
-            return {'count': len(db['skills'])}
-        return {'count': 0}
-    
-    elif 'FROM experiences' in sql:
-        if db['experiences']:
-            return {'count': len(db['experiences'])}
-        return {'count': 0}
-    
-    elif 'FROM articles' in sql and 'published' in sql:
-        published_count = len([a for a in db['articles'] if a.get('published')])
-        return {'count': published_count}
-    
-    return None
-
-def query_all(sql, params=None):
-    """Simulate database query - return all results"""
-    db = load_db()
-    
-    if 'FROM projects' in sql:
-        return db['projects']
-    elif 'FROM skills' in sql:
-        return db['skills']
-    elif 'FROM experiences' in sql:
-        return db['experiences']
-    elif 'FROM articles' in sql:
-        return [a for a in db['articles'] if a.get('published', True)]
-    
-    return []
-
-def execute(sql, params=None, fetch=False):
-    """Execute insert/update/delete"""
-    db = load_db()
-    
-    # Placeholder - for JSON database, writes are simple
-    # This would need custom logic for actual inserts/updates
-    save_db(db)
-    return None
+    def delete(self):
+        """Remove every matching row, in one commit; returns the count"""
+        def prepare():
+            ids = [row['id'] for row in self._run()]
+            return [{'op': 'delete', 'c': self.collection, 'id': row_id} for row_id in ids], len(ids)
+        return _submit(prepare)
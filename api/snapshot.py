@@ -0,0 +1,201 @@
+"""Binary snapshot format for db.py (``JSON_DB_FORMAT=binary``).
+
+A cold start with a JSON snapshot has to parse the whole file before the
+first lookup. A binary snapshot is memory-mapped instead: opening it reads
+a small directory, and a lookup by ``id`` or a unique field binary-searches
+a sorted key table and decodes one row, so it only touches the pages it
+needs. A whole collection is decoded with a single ``json.loads`` when a
+query or a write needs it in memory.
+
+Layout (integers little-endian):
+
+- header: ``MAGIC``, then directory offset and length (``<QQ``)
+- per collection:
+  - rows: each row as compact JSON, comma separated, so a whole collection
+    is ``b'[' + rows + b']'``
+  - offsets: ``count + 1`` x ``<Q``, where row ``i`` is
+    ``[offsets[i], offsets[i + 1] - 1)``
+  - per indexed field (``id`` and the unique fields): ``count`` x
+    ``<QII`` entries (key offset, key length, row number) sorted by key,
+    then the keys as compact JSON
+- directory: JSON with the non-list top-level values (``_seq``) and, for
+  each collection, its count, offsets position and index positions
+
+Only the standard library is used (no msgpack), so it runs wherever the
+serverless function runs. Convert between formats with::
+
+    python snapshot.py to-binary data.json data.snap
+    python snapshot.py to-json data.snap data.json
+"""
+import argparse
+import json
+import mmap
+import struct
+
+MAGIC = b'JSONDB\x00\x01'
+HEADER = struct.Struct('<QQ')
+OFFSET = struct.Struct('<Q')
+ENTRY = struct.Struct('<QII')
+
+
+def _encode(value):
+    return json.dumps(value, separators=(',', ':'), default=str).encode()
+
+
+def dump(data, f, unique=None):
+    """Write ``data`` (as returned by ``db.load_db``) to the binary file ``f``.
+
+    Every collection gets an ``id`` index, plus the fields listed for it in
+    ``unique`` (``{collection: (field, ...)}``).
+    """
+    unique = unique or {}
+    f.write(MAGIC + HEADER.pack(0, 0))
+    directory = {'meta': {}, 'collections': {}}
+    for name, rows in data.items():
+        if not isinstance(rows, list):
+            directory['meta'][name] = rows
+            continue
+        offsets = []
+        position = f.tell()
+        for i, row in enumerate(rows):
+            body = _encode(row) if i == 0 else b',' + _encode(row)
+            offsets.append(position + (i > 0))
+            f.write(body)
+            position += len(body)
+        offsets.append(position + 1)
+
+        entry = {'count': len(rows), 'offsets': f.tell(), 'indexes': {}}
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        for field in ('id',) + tuple(unique.get(name, ())):
+            keys = sorted((_encode(row[field]), i) for i, row in enumerate(rows) if field in row)
+            entries = f.tell()
+            key_position = entries + ENTRY.size * len(keys)
+            for key, i in keys:
+                f.write(ENTRY.pack(key_position, len(key), i))
+                key_position += len(key)
+            for key, _ in keys:
+                f.write(key)
+            entry['indexes'][field] = [entries, len(keys)]
+        directory['collections'][name] = entry
+
+    position = f.tell()
+    body = _encode(directory)
+    f.write(body)
+    f.seek(len(MAGIC))
+    f.write(HEADER.pack(position, len(body)))
+    f.seek(0, 2)
+
+
+class Snapshot:
+    """Read-only view of a binary snapshot.
+
+    The mapping stays valid after the file is replaced by a newer snapshot
+    (the old inode lives until it is unmapped), so a reader keeps a
+    consistent view until it reloads.
+    """
+
+    def __init__(self, f):
+        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError('not a binary snapshot')
+        position, length = HEADER.unpack_from(self._map, len(MAGIC))
+        directory = json.loads(self._map[position:position + length])
+        self.meta = directory['meta']
+        self._collections = directory['collections']
+
+    @property
+    def collections(self):
+        return list(self._collections)
+
+    def count(self, name):
+        return self._collections[name]['count']
+
+    def has_index(self, name, field):
+        return name in self._collections and field in self._collections[name]['indexes']
+
+    def row(self, name, i):
+        start, end = struct.unpack_from('<QQ', self._map, self._collections[name]['offsets'] + OFFSET.size * i)
+        return json.loads(self._map[start:end - 1])
+
+    def rows(self, name):
+        """Every row of a collection, decoded in one pass"""
+        entry = self._collections[name]
+        if not entry['count']:
+            return []
+        first, = OFFSET.unpack_from(self._map, entry['offsets'])
+        end, = OFFSET.unpack_from(self._map, entry['offsets'] + OFFSET.size * entry['count'])
+        return json.loads(b'[' + self._map[first:end - 1] + b']')
+
+    def find(self, name, field, value):
+        """Row whose indexed ``field`` equals ``value``, or None"""
+        entries, count = self._collections[name]['indexes'][field]
+        key = _encode(value)
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            position, length, i = ENTRY.unpack_from(self._map, entries + ENTRY.size * mid)
+            probe = self._map[position:position + length]
+            if probe == key:
+                return self.row(name, i)
+            if probe < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def to_dict(self):
+        data = dict(self.meta)
+        for name in self._collections:
+            data[name] = self.rows(name)
+        return data
+
+    def close(self):
+        self._map.close()
+
+
+def to_binary(source, target, unique=None):
+    with open(source, 'rb') as f:
+        data = json.load(f)
+    with open(target, 'wb') as f:
+        dump(data, f, unique)
+
+
+def to_json(source, target):
+    with open(source, 'rb') as f:
+        snapshot = Snapshot(f)
+    try:
+        data = snapshot.to_dict()
+    finally:
+        snapshot.close()
+    with open(target, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert db.py snapshots between JSON and binary')
+    sub = parser.add_subparsers(dest='command', required=True)
+    binary = sub.add_parser('to-binary', help='data.json -> data.snap')
+    binary.add_argument('source')
+    binary.add_argument('target')
+    # Keep in step with db.UNIQUE_INDEXES; db.py rewrites the snapshot
+    # with its own indexes on the next compaction anyway
+    binary.add_argument('--index', action='append', default=None, metavar='COLLECTION.FIELD',
+                        help='unique field to index besides id (default: users.username)')
+    back = sub.add_parser('to-json', help='data.snap -> data.json')
+    back.add_argument('source')
+    back.add_argument('target')
+    args = parser.parse_args()
+
+    if args.command == 'to-binary':
+        unique = {}
+        for spec in args.index or ['users.username']:
+            collection, field = spec.split('.', 1)
+            unique.setdefault(collection, []).append(field)
+        to_binary(args.source, args.target, unique)
+    else:
+        to_json(args.source, args.target)
+
+
+if __name__ == '__main__':
+    main()